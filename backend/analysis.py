@@ -0,0 +1,325 @@
+import heapq
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# Frame-count sweeps. LRU is a stack algorithm: a reference hits with f frames
+# exactly when its stack distance is at most f, so one pass over the trace
+# gives every frame count. Other algorithms are simulated once per frame
+# count, spread over worker processes when the work is large enough.
+STACK_ALGORITHMS = {'LRU'}
+WORKERS = int(os.environ.get("SWEEP_WORKERS", os.cpu_count() or 1))
+# References simulated before a pool beats its start-up cost
+PARALLEL_MIN_WORK = 2 * 10**6
+# References simulated while shrinking one anomaly's witness
+WITNESS_BUDGET = 2 * 10**6
+MAX_WITNESSES = 5
+MAX_FRAMES = 512
+FOOTPRINT_POINTS = 256
+# Space-saving keeps this many counters per hot page reported
+SKETCH_FACTOR = 10
+MAX_TOP_K = 1000
+
+class Fenwick:
+    def __init__(self, size, ones=0):
+        # The first `ones` positions start at 1, built in linear time
+        self.size = size
+        tree = [0] * (size + 1)
+        for i in range(1, size + 1):
+            if i <= ones:
+                tree[i] += 1
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def add(self, i, delta):
+        tree = self.tree
+        i += 1
+        while i <= self.size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        # Sum of positions [0, i)
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+class StackDistances:
+    # LRU stack distance of each reference, or None on first use. The tree is
+    # indexed by last-use time and renumbered when it fills, so it holds
+    # O(unique pages) entries however long the trace is.
+    def __init__(self):
+        self.last_use = {}
+        self.capacity = 1024
+        self.tree = Fenwick(self.capacity)
+        self.clock = 0
+
+    def compact(self):
+        order = sorted(self.last_use, key=self.last_use.get)
+        self.last_use = {page: t for t, page in enumerate(order)}
+        self.capacity = max(1024, 2 * len(order))
+        self.tree = Fenwick(self.capacity, len(order))
+        self.clock = len(order)
+
+    def observe(self, page):
+        return self.observe_many((page,))[0]
+
+    def observe_many(self, pages):
+        # The tree walks are inlined: this loop is the cost of a profile
+        distances = []
+        record = distances.append
+        last_use = self.last_use
+        tree = self.tree.tree
+        size = self.capacity
+        clock = self.clock
+        for page in pages:
+            if clock == size:
+                self.clock = clock
+                self.compact()
+                last_use = self.last_use
+                tree = self.tree.tree
+                size = self.capacity
+                clock = self.clock
+            t = last_use.get(page)
+            if t is None:
+                record(None)
+            else:
+                # Distinct pages used since, plus the page itself
+                i = t + 1
+                seen = 0
+                while i:
+                    seen += tree[i]
+                    i &= i - 1
+                record(len(last_use) - seen + 1)
+                i = t + 1
+                while i <= size:
+                    tree[i] -= 1
+                    i += i & -i
+            i = clock + 1
+            while i <= size:
+                tree[i] += 1
+                i += i & -i
+            last_use[page] = clock
+            clock += 1
+        self.clock = clock
+        return distances
+
+    @property
+    def unique(self):
+        return len(self.last_use)
+
+def stack_distances(pages):
+    return StackDistances().observe_many(pages)
+
+def lru_fault_curve(pages, max_frames):
+    # faults[f - 1] for f = 1..max_frames
+    cold = 0
+    counts = [0] * (max_frames + 2)
+    for distance in stack_distances(pages):
+        if distance is None:
+            cold += 1
+        else:
+            counts[min(distance, max_frames + 1)] += 1
+    faults = []
+    misses = cold + sum(counts[2:])
+    for frames in range(1, max_frames + 1):
+        faults.append(misses)
+        misses -= counts[frames + 1]
+    return faults
+
+def count_faults(simulator_factory, trace, frames, algorithm):
+    return simulator_factory().simulate(trace, frames, algorithm, record_history=False)['total_page_faults']
+
+_worker_state = {}
+
+def _init_worker(simulator_factory, trace):
+    _worker_state['factory'] = simulator_factory
+    _worker_state['trace'] = trace
+
+def _worker_faults(task):
+    algorithm, frames = task
+    return count_faults(_worker_state['factory'], _worker_state['trace'], frames, algorithm)
+
+def fault_curves(simulator_factory, trace, max_frames, algorithms):
+    curves = {}
+    tasks = []
+    for algorithm in algorithms:
+        if algorithm in STACK_ALGORITHMS:
+            curves[algorithm] = lru_fault_curve(trace, max_frames)
+        else:
+            tasks.extend((algorithm, frames) for frames in range(1, max_frames + 1))
+
+    if len(tasks) * len(trace) >= PARALLEL_MIN_WORK and WORKERS > 1:
+        # The trace goes to each worker once, not with every task
+        with ProcessPoolExecutor(WORKERS, initializer=_init_worker, initargs=(simulator_factory, trace)) as pool:
+            faults = list(pool.map(_worker_faults, tasks, chunksize=max(1, len(tasks) // (4 * WORKERS))))
+    else:
+        faults = [count_faults(simulator_factory, trace, frames, algorithm) for algorithm, frames in tasks]
+
+    for (algorithm, _), count in zip(tasks, faults):
+        curves.setdefault(algorithm, []).append(count)
+    return curves
+
+def anomalous_prefix(simulator_factory, trace, frames, algorithm):
+    # Shortest prefix on which `frames` faults more often than `frames - 1`
+    logs = []
+    for count in (frames - 1, frames):
+        log = array('i')
+        simulator_factory().simulate(trace, count, algorithm, record_history=False, frame_log=log)
+        logs.append(log)
+    excess = 0
+    for i, (fewer, more) in enumerate(zip(*logs)):
+        excess += (more >= 0) - (fewer >= 0)
+        if excess > 0:
+            return trace[:i + 1]
+    return trace
+
+def minimize_witness(simulator_factory, trace, frames, algorithm, budget=WITNESS_BUDGET):
+    # ddmin over the anomalous prefix: drop chunks while the anomaly persists,
+    # halving chunk size down to single references. Returns the witness and
+    # whether it is 1-minimal (no single reference can be removed).
+    spent = 0
+
+    def anomalous(candidate):
+        nonlocal spent
+        spent += 2 * len(candidate)
+        return count_faults(simulator_factory, candidate, frames, algorithm) > count_faults(simulator_factory, candidate, frames - 1, algorithm)
+
+    witness = anomalous_prefix(simulator_factory, trace, frames, algorithm)
+    parts = 2
+    while len(witness) >= 2:
+        size = -(-len(witness) // parts)
+        for start in range(0, len(witness), size):
+            if spent > budget:
+                return witness, False
+            candidate = witness[:start] + witness[start + size:]
+            if anomalous(candidate):
+                witness = candidate
+                parts = max(parts - 1, 2)
+                break
+        else:
+            if size == 1:
+                break
+            parts = min(len(witness), 2 * parts)
+    return witness, True
+
+def sweep(simulator_factory, trace, max_frames, algorithms):
+    curves = fault_curves(simulator_factory, trace, max_frames, algorithms)
+    results = []
+    for algorithm in algorithms:
+        faults = curves[algorithm]
+        anomalies = []
+        for frames in range(2, max_frames + 1):
+            if faults[frames - 1] <= faults[frames - 2]:
+                continue
+            anomaly = {'frames': frames, 'faults': faults[frames - 1], 'previous_faults': faults[frames - 2]}
+            if len(anomalies) < MAX_WITNESSES:
+                anomaly['witness'], anomaly['witness_minimal'] = minimize_witness(simulator_factory, trace, frames, algorithm)
+            anomalies.append(anomaly)
+        results.append({
+            'algorithm': algorithm,
+            'method': 'stack_distance' if algorithm in STACK_ALGORITHMS else 'simulation',
+            'faults': faults,
+            'anomalies': anomalies
+        })
+    return results
+
+class SpaceSaving:
+    # Top-k counts in fixed memory (Metwally et al.). A new page takes over
+    # the smallest counter and inherits its count as possible overcount.
+    # Heap keys are only refreshed when they surface during an eviction;
+    # counts never drop, so a key that is still current is the minimum.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.heap = []
+
+    def add(self, page):
+        counts = self.counts
+        if page in counts:
+            counts[page] += 1
+        elif len(counts) < self.capacity:
+            counts[page] = 1
+            self.errors[page] = 0
+            heapq.heappush(self.heap, (1, page))
+        else:
+            heap = self.heap
+            while True:
+                count, victim = heap[0]
+                current = counts[victim]
+                if current == count:
+                    break
+                heapq.heapreplace(heap, (current, victim))
+            del counts[victim]
+            del self.errors[victim]
+            counts[page] = count + 1
+            self.errors[page] = count
+            heapq.heapreplace(heap, (count + 1, page))
+
+    def top(self, k):
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1])[:k]
+        return [{'page': page, 'count': count, 'error': self.errors[page]} for page, count in ranked]
+
+def log2_buckets(counts):
+    # counts[b] holds values in [2**b, 2**(b+1))
+    return [{'min': 1 << b, 'max': (2 << b) - 1, 'count': count} for b, count in enumerate(counts) if count]
+
+class TraceProfile:
+    # One pass over a trace, fed in chunks, in memory proportional to the
+    # number of unique pages rather than the trace length
+    def __init__(self, length, top_k=10):
+        self.length = length
+        self.top_k = top_k
+        self.position = 0
+        self.distances = StackDistances()
+        self.last_index = {}
+        self.cold = 0
+        self.reuse_counts = []
+        self.gap_counts = []
+        self.interval = max(1, -(-length // FOOTPRINT_POINTS))
+        self.footprint = []
+        self.sketch = SpaceSaving(max(top_k, 1) * SKETCH_FACTOR)
+
+    def update(self, pages):
+        count = self.sketch.add
+        last_index = self.last_index
+        reuse_counts = self.reuse_counts
+        gap_counts = self.gap_counts
+        interval = self.interval
+        i = self.position
+        for page, distance in zip(pages, self.distances.observe_many(pages)):
+            count(page)
+            if distance is None:
+                self.cold += 1
+            else:
+                bucket = distance.bit_length() - 1
+                while len(reuse_counts) <= bucket:
+                    reuse_counts.append(0)
+                reuse_counts[bucket] += 1
+                bucket = (i - last_index[page]).bit_length() - 1
+                while len(gap_counts) <= bucket:
+                    gap_counts.append(0)
+                gap_counts[bucket] += 1
+            last_index[page] = i
+            i += 1
+            if i % interval == 0:
+                self.footprint.append([i, len(last_index)])
+        self.position = i
+
+    def result(self):
+        if self.position % self.interval:
+            self.footprint.append([self.position, len(self.last_index)])
+        return {
+            'length': self.position,
+            'unique_pages': len(self.last_index),
+            'reuse_distance': {'cold': self.cold, 'buckets': log2_buckets(self.reuse_counts)},
+            'gaps': {'buckets': log2_buckets(self.gap_counts)},
+            'footprint': {'interval': self.interval, 'points': self.footprint},
+            'hot_pages': self.sketch.top(self.top_k)
+        }
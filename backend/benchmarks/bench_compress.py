@@ -0,0 +1,80 @@
+import argparse
+import json
+import time
+from array import array
+
+import orjson
+
+import columnar
+from compression import brotli, brotli_compressor, gzip_compressor
+from main import PageReplacementSimulator
+from benchmarks.bench_simulate import metadata
+from benchmarks.traces import STANDARD_TRACES, standard_trace
+
+GZIP_LEVELS = [1, 3, 4, 5, 6, 9]
+BROTLI_QUALITIES = [0, 1, 2, 3, 4, 5, 6, 9]
+
+def payloads(trace, frames, algorithm):
+    result = PageReplacementSimulator().simulate(trace, frames, algorithm)
+    frame_log = array('i')
+    packed = PageReplacementSimulator().simulate(trace, frames, algorithm, record_history=False, frame_log=frame_log)
+    return {
+        'json': orjson.dumps([result]),
+        'columnar': columnar.encode([(algorithm, trace, frame_log, frames, packed['total_hits'])]),
+    }
+
+def measure(factory, body, repeat):
+    best = None
+    for _ in range(repeat):
+        compress, finish = factory()
+        start = time.perf_counter()
+        compressed = compress(body) + finish()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(compressed)
+
+def codecs():
+    for level in GZIP_LEVELS:
+        yield f"gzip-{level}", lambda level=level: gzip_compressor(level)
+    if brotli is not None:
+        for quality in BROTLI_QUALITIES:
+            yield f"br-{quality}", lambda quality=quality: brotli_compressor(quality)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CPU cost against bytes saved for response compression")
+    parser.add_argument('--traces', nargs='+', default=['zipf', 'loop'], choices=list(STANDARD_TRACES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10**3, 10**4, 10**5])
+    parser.add_argument('--frames', type=int, default=16)
+    parser.add_argument('--algorithm', default='LRU')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for trace_name in args.traces:
+        for size in args.sizes:
+            bodies = payloads(standard_trace(trace_name, size), args.frames, args.algorithm.upper())
+            for payload, body in bodies.items():
+                for codec, factory in codecs():
+                    seconds, compressed = measure(factory, body, args.repeat)
+                    entry = {
+                        'name': f"{codec}/{payload}/{trace_name}/n={size}",
+                        'codec': codec,
+                        'payload': payload,
+                        'trace': trace_name,
+                        'size': size,
+                        'bytes': len(body),
+                        'compressed_bytes': compressed,
+                        'ratio': len(body) / compressed,
+                        'seconds': seconds,
+                        'megabytes_per_second': len(body) / seconds / 1e6 if seconds > 0 else None,
+                    }
+                    results.append(entry)
+                    print(f"{entry['name']:<40} {len(body):>12,} -> {compressed:>10,} B  x{entry['ratio']:6.1f}  {seconds * 1000:9.2f} ms  {entry['megabytes_per_second']:8.1f} MB/s", flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
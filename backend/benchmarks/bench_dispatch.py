@@ -0,0 +1,89 @@
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from main import PageReplacementSimulator
+from policies import DEFAULT_POLICIES
+from benchmarks.bench_simulate import metadata, time_run
+from benchmarks.traces import STANDARD_TRACES, standard_trace
+
+# Before/after for the policy registry: times simulate() as of an older
+# commit (the if/elif dispatch on the algorithm string, which scans the page
+# table on every fault) against the current one on the same traces. That
+# simulate() always records history, so both sides record it here.
+REGISTRY_PARENT = "802e034^"
+
+def load_simulator(rev):
+    source = subprocess.run(['git', 'show', f'{rev}:backend/main.py'], capture_output=True, check=True).stdout
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'main_before.py')
+    with open(path, 'wb') as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location('main_before', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.PageReplacementSimulator
+
+def time_before(simulator_class, trace, frames, algorithm, repeat):
+    best = None
+    for _ in range(repeat):
+        simulator = simulator_class()
+        gc.collect()
+        start = time.perf_counter()
+        result = simulator.simulate(trace, frames, algorithm)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result['total_page_faults']
+
+def run(args):
+    before_class = load_simulator(args.before)
+    results = []
+    for trace_name in args.traces:
+        for size in args.sizes:
+            trace = standard_trace(trace_name, size)
+            for frames in args.frames:
+                for algorithm in args.algorithms:
+                    before, before_faults = time_before(before_class, trace, frames, algorithm, args.repeat)
+                    after = time_run(trace, frames, algorithm, True, args.repeat)
+                    after_faults = PageReplacementSimulator().simulate(trace, frames, algorithm, record_history=False)['total_page_faults']
+                    entry = {
+                        'name': f"{algorithm}/{trace_name}/n={size}/frames={frames}",
+                        'algorithm': algorithm,
+                        'trace': trace_name,
+                        'size': size,
+                        'frames': frames,
+                        'before_seconds': before,
+                        'after_seconds': after,
+                        'speedup': before / after if after > 0 else None,
+                        # OPTIMAL differs where the old code evicted the first loaded page
+                        # instead of a farthest page 0
+                        'same_faults': before_faults == after_faults,
+                    }
+                    results.append(entry)
+                    print(f"{entry['name']:<45} {before * 1000:>9.1f} ms {after * 1000:>9.1f} ms {entry['speedup']:>6.1f}x", flush=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare simulate() before the policy registry with the current one")
+    parser.add_argument('--before', default=REGISTRY_PARENT, help="git revision to time as the baseline")
+    parser.add_argument('--traces', nargs='+', default=list(STANDARD_TRACES), choices=list(STANDARD_TRACES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10**3, 10**4])
+    parser.add_argument('--frames', nargs='+', type=int, default=[16, 256])
+    parser.add_argument('--algorithms', nargs='+', default=DEFAULT_POLICIES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="write results as JSON to this path")
+    args = parser.parse_args()
+    args.algorithms = [algorithm.upper() for algorithm in args.algorithms]
+
+    results = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': {**metadata(), 'before': args.before}, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
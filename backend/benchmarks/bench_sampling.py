@@ -0,0 +1,91 @@
+import argparse
+import json
+import time
+
+import sampling
+from main import PageReplacementSimulator
+from policies import DEFAULT_POLICIES
+from benchmarks.bench_simulate import metadata
+from benchmarks.traces import STANDARD_TRACES, standard_trace
+
+RATES = [0.1, 0.05, 0.01]
+FRAMES = [256, 1024, 4096]
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - start
+
+def run(args):
+    results = []
+    for trace_name in args.traces:
+        for size in args.sizes:
+            trace = standard_trace(trace_name, size)
+            for frames in args.frames:
+                for algorithm in args.algorithms:
+                    exact, exact_seconds = timed(lambda: PageReplacementSimulator().simulate(trace, frames, algorithm, record_history=False))
+                    for rate in args.rates:
+                        # /simulate rejects these rates for this many frames
+                        if sampling.scaled_frames(frames, rate) < sampling.MIN_SCALED_FRAMES:
+                            continue
+                        # Sampling is part of the approximate run's cost
+                        approx, approx_seconds = timed(lambda: sampling.estimate(PageReplacementSimulator, sampling.sample(trace, rate).tolist(), size, frames, algorithm, rate))
+                        entry = {
+                            'name': f"{algorithm}/{trace_name}/n={size}/frames={frames}/rate={rate}",
+                            'algorithm': algorithm,
+                            'trace': trace_name,
+                            'size': size,
+                            'frames': frames,
+                            'rate': rate,
+                            'exact_fault_ratio': exact['fault_ratio'],
+                            'approx_fault_ratio': approx['fault_ratio'],
+                            'absolute_error': abs(approx['fault_ratio'] - exact['fault_ratio']),
+                            'speedup': exact_seconds / approx_seconds if approx_seconds > 0 else None,
+                        }
+                        results.append(entry)
+                        print(f"{entry['name']:<50} exact {entry['exact_fault_ratio']:.4f}  approx {entry['approx_fault_ratio']:.4f}  error {entry['absolute_error']:.4f}  {entry['speedup']:>6.1f}x", flush=True)
+            del trace
+    return results
+
+def summarize(results):
+    # Error bounds per algorithm and rate: mean and worst absolute error in
+    # the fault ratio over every trace, size and frame count
+    summary = {}
+    print(f"\n{'algorithm':<10} {'rate':>6} {'runs':>5} {'mean error':>11} {'max error':>10} {'speedup':>8}")
+    for algorithm in dict.fromkeys(entry['algorithm'] for entry in results):
+        summary[algorithm] = {}
+        for rate in sorted({entry['rate'] for entry in results}, reverse=True):
+            runs = [entry for entry in results if entry['algorithm'] == algorithm and entry['rate'] == rate]
+            if not runs:
+                continue
+            errors = [entry['absolute_error'] for entry in runs]
+            speedups = sorted(entry['speedup'] for entry in runs if entry['speedup'])
+            row = {
+                'runs': len(runs),
+                'mean_absolute_error': sum(errors) / len(errors),
+                'max_absolute_error': max(errors),
+                'median_speedup': speedups[len(speedups) // 2] if speedups else None,
+            }
+            summary[algorithm][str(rate)] = row
+            print(f"{algorithm:<10} {rate:>6} {row['runs']:>5} {row['mean_absolute_error']:>11.4f} {row['max_absolute_error']:>10.4f} {row['median_speedup'] or 0:>7.1f}x")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sampled (approximate) runs against exact simulate() on the standard traces")
+    parser.add_argument('--traces', nargs='+', default=list(STANDARD_TRACES), choices=list(STANDARD_TRACES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10**6])
+    parser.add_argument('--frames', nargs='+', type=int, default=FRAMES)
+    parser.add_argument('--rates', nargs='+', type=float, default=RATES)
+    parser.add_argument('--algorithms', nargs='+', default=DEFAULT_POLICIES)
+    parser.add_argument('--output', help="write results as JSON to this path")
+    args = parser.parse_args()
+    args.algorithms = [algorithm.upper() for algorithm in args.algorithms]
+
+    results = run(args)
+    summary = summarize(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(), 'summary': summary, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
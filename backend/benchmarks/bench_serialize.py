@@ -0,0 +1,65 @@
+import argparse
+import json
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from main import PageReplacementSimulator
+from benchmarks.bench_simulate import metadata
+from benchmarks.traces import STANDARD_TRACES, standard_trace
+
+RESPONSE_KEYS = ['paging_type', 'algorithm', 'total_page_faults', 'total_hits', 'hit_ratio', 'fault_ratio', 'history', 'page_table', 'final_memory_state']
+
+def previous_path(result):
+    # What /simulate did before: copy the keys into a new dict, run
+    # jsonable_encoder, then JSONResponse's json.dumps
+    entry = {key: result[key] for key in RESPONSE_KEYS}
+    encoded = jsonable_encoder([entry])
+    return json.dumps(encoded, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def current_path(result):
+    return orjson.dumps([result])
+
+def best_of(function, result, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = function(result)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare /simulate response serialization paths")
+    parser.add_argument('--trace', default='zipf', choices=list(STANDARD_TRACES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10**3, 10**4, 10**5])
+    parser.add_argument('--frames', type=int, default=16)
+    parser.add_argument('--algorithm', default='LRU')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        result = PageReplacementSimulator().simulate(standard_trace(args.trace, size), args.frames, args.algorithm.upper())
+        before, before_bytes = best_of(previous_path, result, args.repeat)
+        after, after_bytes = best_of(current_path, result, args.repeat)
+        entry = {
+            'name': f"serialize/{args.algorithm.upper()}/{args.trace}/n={size}/frames={args.frames}",
+            'size': size,
+            'jsonable_encoder_seconds': before,
+            'orjson_seconds': after,
+            'speedup': before / after if after > 0 else None,
+            'bytes': after_bytes,
+            'previous_bytes': before_bytes,
+        }
+        results.append(entry)
+        print(f"{entry['name']:<45} before {before * 1000:9.1f} ms  after {after * 1000:8.1f} ms  x{entry['speedup']:.1f}", flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from main import PageReplacementSimulator
+from policies import DEFAULT_POLICIES
+from benchmarks.traces import QUICK_SIZES, SIZES, STANDARD_TRACES, standard_trace
+
+# Runs longer than this keep history off, otherwise the per-step snapshots
+# dominate both time and memory
+HISTORY_LIMIT = 10**5
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def metadata():
+    return {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.platform(),
+    }
+
+def time_run(trace, frames, algorithm, record_history, repeat):
+    best = None
+    for _ in range(repeat):
+        simulator = PageReplacementSimulator()
+        gc.collect()
+        start = time.perf_counter()
+        simulator.simulate(trace, frames, algorithm, record_history=record_history)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del simulator
+    return best
+
+def memory_run(trace, frames, algorithm, record_history):
+    # Separate pass: tracemalloc slows the loop down too much to time it
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    simulator = PageReplacementSimulator()
+    result = simulator.simulate(trace, frames, algorithm, record_history=record_history)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks_before
+    del result, simulator
+    return peak, blocks
+
+def run(args):
+    results = []
+    for trace_name in args.traces:
+        for size in args.sizes:
+            trace = standard_trace(trace_name, size)
+            record_history = args.history and size <= HISTORY_LIMIT
+            for frames in args.frames:
+                for algorithm in args.algorithms:
+                    seconds = time_run(trace, frames, algorithm, record_history, args.repeat)
+                    entry = {
+                        'name': f"{algorithm}/{trace_name}/n={size}/frames={frames}/history={int(record_history)}",
+                        'algorithm': algorithm,
+                        'trace': trace_name,
+                        'size': size,
+                        'frames': frames,
+                        'history': record_history,
+                        'seconds': seconds,
+                        'accesses_per_second': size / seconds if seconds > 0 else None,
+                    }
+                    if args.memory:
+                        entry['peak_memory_bytes'], entry['allocated_blocks'] = memory_run(trace, frames, algorithm, record_history)
+                    results.append(entry)
+                    print(f"{entry['name']:<55} {entry['accesses_per_second']:>14,.0f} acc/s", flush=True)
+            del trace
+    return results
+
+# Memory fields checked by compare(), when both runs recorded them
+MEMORY_FIELDS = ('peak_memory_bytes', 'allocated_blocks')
+
+def compare(results, baseline_path, threshold, memory_threshold):
+    with open(baseline_path) as f:
+        baseline = {entry['name']: entry for entry in json.load(f)['results']}
+    regressions = 0
+    print(f"\n{'benchmark':<55} {'metric':<20} {'baseline':>14} {'current':>14} {'change':>8}")
+    for entry in results:
+        old = baseline.get(entry['name'])
+        if old is None:
+            continue
+        # Throughput regresses when it drops, memory when it grows
+        checks = [('accesses_per_second', threshold, -1)]
+        checks += [(field, memory_threshold, 1) for field in MEMORY_FIELDS]
+        for field, limit, direction in checks:
+            if not old.get(field) or old[field] < 0 or entry.get(field) is None:
+                continue
+            change = entry[field] / old[field] - 1
+            flag = ''
+            if direction * change > limit:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{entry['name']:<55} {field:<20} {old[field]:>14,.0f} {entry[field]:>14,.0f} {change:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PageReplacementSimulator.simulate over the standard traces")
+    parser.add_argument('--traces', nargs='+', default=list(STANDARD_TRACES), choices=list(STANDARD_TRACES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=None)
+    parser.add_argument('--quick', action='store_true', help=f"only sizes {QUICK_SIZES}")
+    parser.add_argument('--frames', nargs='+', type=int, default=[16, 256])
+    parser.add_argument('--algorithms', nargs='+', default=DEFAULT_POLICIES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-history', dest='history', action='store_false', help="never record per-step history")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="skip the tracemalloc pass")
+    parser.add_argument('--output', help="write results as JSON to this path")
+    parser.add_argument('--compare', help="baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="throughput drop reported as a regression")
+    parser.add_argument('--memory-threshold', type=float, default=0.10, help="peak memory or allocated block growth reported as a regression")
+    args = parser.parse_args()
+    if args.sizes is None:
+        args.sizes = QUICK_SIZES if args.quick else SIZES
+    args.algorithms = [algorithm.upper() for algorithm in args.algorithms]
+
+    results = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+    if args.compare:
+        sys.exit(1 if compare(results, args.compare, args.threshold, args.memory_threshold) else 0)
+
+if __name__ == '__main__':
+    main()
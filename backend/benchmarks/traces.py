@@ -0,0 +1,19 @@
+import workloads
+
+# Standard synthetic traces shared by every benchmark. The seed is fixed so a
+# given (name, size) pair is the same trace on every machine and commit.
+SEED = 20250519
+
+STANDARD_TRACES = {
+    'zipf': {'model': 'ZIPF', 'pages': 4096, 'params': {'alpha': 0.9}},
+    'working_set': {'model': 'WORKING_SET', 'pages': 65536, 'params': {'working_set': 200, 'phase_length': 20000}},
+    'loop': {'model': 'LOOP', 'pages': 65536, 'params': {'loop_length': 300}},
+    'markov': {'model': 'MARKOV', 'pages': 8192, 'params': {'locality': 0.95, 'window': 8}},
+}
+
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+QUICK_SIZES = [10**3, 10**4, 10**5]
+
+def standard_trace(name, size):
+    spec = STANDARD_TRACES[name]
+    return workloads.generate(spec['model'], size, spec['pages'], SEED, **spec['params']).tolist()
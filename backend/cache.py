@@ -0,0 +1,231 @@
+import numpy as np
+
+from policies import Policy, get_policy
+
+# Set-associative cache hierarchy. Each set runs its own instance of a page
+# replacement policy over the lines that map to it. Addresses are decoded and
+# per-set statistics gathered with NumPy; the access loop itself is plain
+# Python, where set and dict lookups beat NumPy scalar indexing.
+#
+# inclusive: every level holds a superset of the one above. A miss fills all
+# levels it missed in, and a lower-level eviction back-invalidates the line
+# above.
+# exclusive: a line lives in one level. L1 victims are demoted a level; a hit
+# below L1 moves the line up to L1.
+MODES = ('inclusive', 'exclusive')
+MAX_LEVELS = 3
+
+def level_policies(sets, ways, algorithm, reference_string):
+    cls = get_policy(algorithm)
+    template = cls(ways, reference_string)
+    if cls.snapshot is Policy.snapshot:
+        # The default snapshot deep-copies, trace included
+        return [template] + [cls(ways, reference_string) for _ in range(sets - 1)]
+    # Snapshots share read-only state such as OPTIMAL's next-use table
+    return [template] + [template.snapshot() for _ in range(sets - 1)]
+
+def validate_levels(levels, line_size, mode):
+    if mode not in MODES:
+        raise ValueError(f"Invalid mode. Choose from {', '.join(MODES)}.")
+    if not 1 <= len(levels) <= MAX_LEVELS:
+        raise ValueError(f"Provide between 1 and {MAX_LEVELS} cache levels.")
+    if line_size < 1:
+        raise ValueError("line_size must be at least 1.")
+    for level in levels:
+        cls = get_policy(level.algorithm)
+        if cls is None:
+            raise ValueError(f"Invalid cache algorithm {level.algorithm}.")
+        if len(levels) > 1 and cls.on_remove is Policy.on_remove:
+            raise ValueError(f"{level.algorithm} can't be used in a cache hierarchy: it doesn't support invalidation.")
+        if level.sets < 1 or level.ways < 1:
+            raise ValueError("Each cache level needs at least 1 set and 1 way.")
+
+class CacheLevel:
+    def __init__(self, sets, ways, algorithm, reference_string):
+        self.sets = sets
+        self.ways = ways
+        self.algorithm = algorithm.upper()
+        self.policies = level_policies(sets, ways, algorithm, reference_string)
+        # Hooks bound once per set
+        self.on_hit = [policy.on_hit for policy in self.policies]
+        self.on_fault = [policy.on_fault for policy in self.policies]
+        self.on_insert = [policy.on_insert for policy in self.policies]
+        self.on_remove = [policy.on_remove for policy in self.policies]
+        self.victim = [policy.victim for policy in self.policies]
+        # Lines resident anywhere in this level; a line maps to one set
+        self.resident = set()
+        self.occupancy = [0] * sets
+        self.evictions = 0
+        self.invalidations = 0
+
+    def fill(self, line, step, demand=True):
+        # Returns the line evicted to make room, if any
+        index = line % self.sets
+        evicted = None
+        if self.occupancy[index] == self.ways:
+            evicted = self.victim[index](step)
+            self.resident.discard(evicted)
+            self.evictions += 1
+        else:
+            self.occupancy[index] += 1
+        (self.on_fault if demand else self.on_insert)[index](line, step)
+        self.resident.add(line)
+        return evicted
+
+    def remove(self, line, step):
+        index = line % self.sets
+        self.on_remove[index](line, step)
+        self.resident.discard(line)
+        self.occupancy[index] -= 1
+
+def inclusive_probe(levels, line, step):
+    # Looks below L1 and fills every level that missed except L1. Returns the
+    # index of the level that served the line, len(levels) for memory.
+    served = len(levels)
+    for index in range(1, served):
+        level = levels[index]
+        if line in level.resident:
+            level.on_hit[line % level.sets](line, step)
+            served = index
+            break
+    # Fill bottom-up so a back-invalidation never misses a copy above
+    for index in range(served - 1, 0, -1):
+        evicted = levels[index].fill(line, step)
+        if evicted is None:
+            continue
+        for upper in range(index):
+            upper = levels[upper]
+            if evicted in upper.resident:
+                upper.remove(evicted, step)
+                upper.invalidations += 1
+    return served
+
+def exclusive_probe(levels, line, step):
+    # A hit below L1 takes the line out of that level on its way up
+    for index in range(1, len(levels)):
+        level = levels[index]
+        if line in level.resident:
+            level.remove(line, step)
+            return index
+    return len(levels)
+
+def exclusive_demote(levels, line, step):
+    index = 1
+    while line is not None and index < len(levels):
+        line = levels[index].fill(line, step, demand=False)
+        index += 1
+
+def simulate_cache(addresses, line_size, configs, mode='inclusive'):
+    try:
+        addresses = np.asarray(addresses, dtype=np.int64)
+    except OverflowError:
+        raise ValueError("Addresses must fit in 64 bits.")
+    if addresses.size and addresses.min() < 0:
+        raise ValueError("Addresses must be non-negative.")
+    lines = addresses // line_size
+    total = len(lines)
+    line_list = lines.tolist()
+    levels = [CacheLevel(config.sets, config.ways, config.algorithm, line_list) for config in configs]
+    first = levels[0]
+
+    # Runs of references to one line: only the first can miss, so levels
+    # below L1 see the run as one reference at its last step. L1 gets the
+    # rest as one hit at that step too, unless its policy needs every hit.
+    if total == 0:
+        # An empty trace has no runs; the stats below come out as zeros
+        starts = np.zeros(0, dtype=np.int64)
+    else:
+        starts = np.flatnonzero(np.concatenate(([True], lines[1:] != lines[:-1])))
+    ends = np.append(starts[1:], total)
+    run_lines = lines[starts]
+
+    probe = None
+    demote = None
+    if len(levels) > 1:
+        probe = inclusive_probe if mode == 'inclusive' else exclusive_probe
+        if mode == 'exclusive':
+            demote = exclusive_demote
+    resident = first.resident
+    occupancy = first.occupancy
+    ways = first.ways
+    on_hit = first.on_hit
+    on_fault = first.on_fault
+    victim = first.victim
+    folds = type(first.policies[0]).folds_repeats
+    evictions = 0
+    # Level that served each run's first reference: 0 for an L1 hit,
+    # len(levels) for memory
+    served = bytearray(len(starts))
+
+    runs = zip(run_lines.tolist(), (run_lines % first.sets).tolist(), starts.tolist(), ends.tolist())
+    for run, (line, index, start, last) in enumerate(runs):
+        if line in resident:
+            if folds:
+                on_hit[index](line, last)
+            else:
+                for repeat in range(start + 1, last + 1):
+                    on_hit[index](line, repeat)
+            continue
+        step = start + 1
+        if probe is not None:
+            # Lower levels see the run as one reference at its last step
+            served[run] = probe(levels, line, last)
+        else:
+            served[run] = 1  # memory
+        if occupancy[index] == ways:
+            evicted = victim[index](step)
+            resident.discard(evicted)
+            evictions += 1
+            if demote is not None:
+                demote(levels, evicted, last)
+        else:
+            occupancy[index] += 1
+        on_fault[index](line, step)
+        resident.add(line)
+        if last > step:
+            if folds:
+                on_hit[index](line, last)
+            else:
+                for repeat in range(step + 1, last + 1):
+                    on_hit[index](line, repeat)
+    first.evictions += evictions
+
+    per_access = np.zeros(total, dtype=np.uint8)
+    per_access[starts] = np.frombuffer(bytes(served), dtype=np.uint8)
+    served = per_access
+    results = []
+    for index, (level, config) in enumerate(zip(levels, configs)):
+        reached = served >= index
+        sets = lines[reached] % level.sets
+        hit = served[reached] == index
+        accesses_per_set = np.bincount(sets, minlength=level.sets)
+        hits_per_set = np.bincount(sets[hit], minlength=level.sets)
+        accesses = int(reached.sum())
+        hits = int(hit.sum())
+        results.append({
+            'level': f"L{index + 1}",
+            'sets': level.sets,
+            'ways': level.ways,
+            'algorithm': level.algorithm,
+            'size_bytes': level.sets * level.ways * line_size,
+            'accesses': accesses,
+            'hits': hits,
+            'misses': accesses - hits,
+            'hit_ratio': hits / accesses if accesses > 0 else 0,
+            'evictions': level.evictions,
+            'back_invalidations': level.invalidations,
+            'per_set': {
+                'hits': hits_per_set.tolist(),
+                'misses': (accesses_per_set - hits_per_set).tolist()
+            }
+        })
+    memory_accesses = int((served == len(levels)).sum())
+    return {
+        'paging_type': 'CACHE',
+        'mode': mode,
+        'line_size': line_size,
+        'accesses': total,
+        'levels': results,
+        'memory_accesses': memory_accesses,
+        'miss_ratio': memory_accesses / total if total > 0 else 0
+    }
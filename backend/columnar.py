@@ -0,0 +1,81 @@
+import struct
+import sys
+from array import array
+
+# Packed columnar encoding of /simulate results, selected with
+# `Accept: application/vnd.page-sim.columnar`. Everything is little-endian and
+# every section starts on a 4-byte boundary so clients can view the columns as
+# Int32Array/Uint8Array without copying.
+#
+#   header   char[4] magic "PRSC", u16 version, u16 result_count
+#   then per result:
+#     u32 steps, u32 frames, u32 hits, u32 faults, u32 name_length
+#     u8  name[name_length]            UTF-8 algorithm name, zero-padded to 4
+#     i32 pages[steps]                 referenced page
+#     i32 frame[steps]                 frame loaded at this step, -1 on a hit
+#     i32 victim[steps]                page replaced at this step, EMPTY if none
+#     i32 memory[steps * frames]       frame contents after each step, EMPTY if free
+#     u8  events[ceil(steps / 8)]      bit (i % 8) of byte i // 8 set when step i
+#                                      faulted, zero-padded to 4
+#
+# EMPTY is -2**31. Hit and fault ratios are left to the client.
+MEDIA_TYPE = "application/vnd.page-sim.columnar"
+MAGIC = b"PRSC"
+VERSION = 1
+EMPTY = -2**31
+
+def accepts_columnar(headers):
+    return MEDIA_TYPE in headers.get("accept", "")
+
+def can_encode(reference_string):
+    # EMPTY is reserved, so pages must lie strictly above it
+    return not reference_string or (min(reference_string) > EMPTY and max(reference_string) < 2**31)
+
+def _pad(buffer):
+    buffer.extend(b"\0" * (-len(buffer) % 4))
+
+def _int32s(values):
+    # array('i') is 32-bit on every platform CPython supports
+    try:
+        return array('i', values)
+    except OverflowError:
+        raise ValueError("page numbers must fit in 32 bits for the columnar format")
+
+def _column_bytes(column):
+    if sys.byteorder == "big":
+        column = array('i', column)
+        column.byteswap()
+    return column.tobytes()
+
+def encode_result(buffer, algorithm, reference_string, frame_log, frame_count, hits):
+    steps = len(frame_log)
+    pages = _int32s(reference_string[:steps])
+    memory = [EMPTY] * frame_count
+    victims = array('i', [EMPTY]) * steps
+    rows = array('i')
+    events = bytearray((steps + 7) // 8)
+
+    # Replay the frame log to rebuild victims and per-step memory rows
+    for i, (page, frame) in enumerate(zip(pages, frame_log)):
+        if frame >= 0:
+            victims[i] = memory[frame]
+            memory[frame] = page
+            events[i >> 3] |= 1 << (i & 7)
+        rows.extend(memory)
+
+    name = algorithm.encode("utf-8")
+    buffer.extend(struct.pack("<5I", steps, frame_count, hits, steps - hits, len(name)))
+    buffer.extend(name)
+    _pad(buffer)
+    for column in (pages, frame_log, victims, rows):
+        buffer.extend(_column_bytes(column))
+    buffer.extend(events)
+    _pad(buffer)
+
+def encode(results):
+    # results: (algorithm, reference_string, frame_log, frame_count, hits) tuples
+    buffer = bytearray(MAGIC)
+    buffer.extend(struct.pack("<HH", VERSION, len(results)))
+    for result in results:
+        encode_result(buffer, *result)
+    return bytes(buffer)
@@ -0,0 +1,121 @@
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Defaults picked with benchmarks/bench_compress.py on the standard traces
+# (results in benchmarks/baselines/compress.json). gzip 4 gets within a few
+# percent of level 6's size at level 1-3 CPU cost; brotli 4 is where looping
+# traces collapse to ~100x while staying around 100-250 MB/s.
+MINIMUM_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", 4))
+BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4))
+
+def gzip_compressor(level):
+    # wbits 16 + MAX_WBITS makes zlib emit a gzip container
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, compressor.flush
+
+def brotli_compressor(quality):
+    compressor = brotli.Compressor(quality=quality)
+    return compressor.process, compressor.finish
+
+def accepted_encodings(header):
+    encodings = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            encodings.add(name.strip().lower())
+    return encodings
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=MINIMUM_SIZE, gzip_level=GZIP_LEVEL, brotli_quality=BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose(self, scope):
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br", lambda: brotli_compressor(self.brotli_quality)
+        if "gzip" in accepted:
+            return "gzip", lambda: gzip_compressor(self.gzip_level)
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding, factory = self.choose(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, CompressingSender(send, encoding, factory, self.minimum_size))
+
+class CompressingSender:
+    # Holds back the response start until the first body chunk shows whether
+    # the response is worth compressing, then compresses chunk by chunk
+    def __init__(self, send, encoding, factory, minimum_size):
+        self.send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.minimum_size = minimum_size
+        self.start = None
+        self.compress = None
+        self.finish = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            if "content-encoding" in headers or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.compress, self.finish = self.factory()
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["content-length"]
+                await self.send(start)
+            else:
+                body = self.compress(body) + self.finish()
+                headers["content-length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+        elif self.passthrough:
+            await self.send(message)
+            return
+
+        chunk = self.compress(body)
+        if not more_body:
+            chunk += self.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+# Simulated access latency. Every reference pays a TLB lookup and a memory
+# access; a TLB miss adds a page-table walk (one memory access), a fault adds
+# the fault service time and a write-back for each dirty frame it frees.
+# Defaults are in nanoseconds for a DRAM-backed TLB and a disk-backed store.
+DEFAULTS = {
+    'tlb_hit_ns': 1.0,
+    'memory_ns': 100.0,
+    'fault_ns': 8000000.0,
+    'write_back_ns': 8000000.0,
+    'tlb_entries': 64
+}
+
+class CostModel:
+    def __init__(self, tlb_hit_ns, memory_ns, fault_ns, write_back_ns, tlb_entries):
+        if min(tlb_hit_ns, memory_ns, fault_ns, write_back_ns) < 0:
+            raise ValueError("Latencies must be non-negative.")
+        if tlb_entries < 0:
+            raise ValueError("tlb_entries must be non-negative.")
+        self.tlb_hit_ns = tlb_hit_ns
+        self.memory_ns = memory_ns
+        self.fault_ns = fault_ns
+        self.write_back_ns = write_back_ns
+        self.tlb_entries = tlb_entries
+        # Fully associative LRU TLB of resident pages
+        self.tlb = OrderedDict()
+        self.tlb_hits = 0
+        self.clock = 0.0
+        self.stall = 0.0
+        # Latency -> references. Latencies only vary with TLB hit, fault and
+        # write-back count, so this stays a handful of entries and percentiles
+        # are exact.
+        self.histogram = {}
+
+    def snapshot(self):
+        clone = CostModel(self.tlb_hit_ns, self.memory_ns, self.fault_ns, self.write_back_ns, self.tlb_entries)
+        clone.tlb = self.tlb.copy()
+        clone.tlb_hits = self.tlb_hits
+        clone.clock = self.clock
+        clone.stall = self.stall
+        clone.histogram = dict(self.histogram)
+        return clone
+
+    def percentile(self, q):
+        # Nearest rank
+        total = sum(self.histogram.values())
+        if total == 0:
+            return 0.0
+        rank = max(1, -(-q * total // 100))
+        seen = 0
+        for latency in sorted(self.histogram):
+            seen += self.histogram[latency]
+            if seen >= rank:
+                return latency
+        return latency
+
+    def summary(self, accesses):
+        return {
+            'simulated_time_ns': self.clock,
+            'effective_access_time_ns': self.clock / accesses if accesses > 0 else 0,
+            'p50_ns': self.percentile(50),
+            'p99_ns': self.percentile(99),
+            'stall_ns': self.stall,
+            'tlb_hits': self.tlb_hits,
+            'tlb_hit_ratio': self.tlb_hits / accesses if accesses > 0 else 0
+        }
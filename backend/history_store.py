@@ -0,0 +1,141 @@
+import os
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+
+# Server-side store for lazily fetched simulation steps. A run is kept as the
+# reference string plus the frame loaded at each step (-1 on hits), with a
+# full memory snapshot every CHECKPOINT_INTERVAL steps. Any step range is
+# rebuilt by replaying from the nearest checkpoint.
+CHECKPOINT_INTERVAL = 1024
+MAX_BYTES = int(os.environ.get("SIMULATION_STORE_BYTES", 256 * 1024 * 1024))
+MAX_STEPS_PER_PAGE = 10000
+
+def _compact(values):
+    try:
+        return array('q', values)
+    except OverflowError:
+        # Pages beyond 64 bits are kept as a plain list
+        return list(values)
+
+class StoredSimulation:
+    def __init__(self, reference_string, frame_log, frame_count, releases=(), interval=CHECKPOINT_INTERVAL):
+        self.pages = _compact(reference_string[:len(frame_log)])
+        self.frame_log = frame_log
+        self.frame_count = frame_count
+        # PFF runs free frames without loading them: {step: [frame, ...]}
+        self.releases = {}
+        for step, frame in releases:
+            self.releases.setdefault(step, []).append(frame)
+        self.interval = interval
+        self.checkpoints = []
+        self.build_checkpoints()
+
+    @property
+    def total_steps(self):
+        return len(self.frame_log)
+
+    def build_checkpoints(self):
+        memory = [None] * self.frame_count
+        for i in range(self.total_steps):
+            if i % self.interval == 0:
+                self.checkpoints.append(tuple(memory))
+            self.apply(memory, i)
+
+    def apply(self, memory, i):
+        # Advances memory over step i (0-based) and returns the step's action
+        prefix = ''
+        for frame in self.releases.get(i + 1, ()):
+            prefix += f"Released page {memory[frame]} (frame {frame}); "
+            memory[frame] = None
+        frame = self.frame_log[i]
+        if frame < 0:
+            return ''
+        victim = memory[frame]
+        memory[frame] = self.pages[i]
+        if victim is None:
+            return f"{prefix}Loaded to frame {frame}"
+        return f"{prefix}Replaced page {victim} (frame {frame})"
+
+    def steps(self, start, stop):
+        start = max(0, start)
+        stop = min(stop, self.total_steps)
+        if start >= stop:
+            return []
+        base = start - start % self.interval
+        memory = list(self.checkpoints[base // self.interval])
+        for i in range(base, start):
+            self.apply(memory, i)
+
+        history = []
+        for i in range(start, stop):
+            action = self.apply(memory, i)
+            history.append({
+                'page': self.pages[i],
+                'memory': list(memory),
+                'event': 'hit' if self.frame_log[i] < 0 else 'fault',
+                'action': action,
+                'step': i + 1
+            })
+        return history
+
+    def nbytes(self):
+        pages = self.pages.itemsize * len(self.pages) if isinstance(self.pages, array) else 36 * len(self.pages)
+        checkpoints = len(self.checkpoints) * (56 + 8 * self.frame_count)
+        return pages + self.frame_log.itemsize * len(self.frame_log) + checkpoints
+
+class SimulationStore:
+    # LRU over simulations, bounded by the estimated bytes they hold and,
+    # optionally, by how long they may sit unused
+    def __init__(self, max_bytes=MAX_BYTES, max_idle=None):
+        self.max_bytes = max_bytes
+        self.max_idle = max_idle
+        self.simulations = OrderedDict()
+        self.sizes = {}
+        self.last_used = {}
+        self.total_bytes = 0
+
+    def add(self, simulation):
+        self.expire()
+        simulation_id = uuid.uuid4().hex
+        self.simulations[simulation_id] = simulation
+        self.sizes[simulation_id] = 0
+        self.last_used[simulation_id] = time.monotonic()
+        self.resize(simulation_id)
+        return simulation_id
+
+    def resize(self, simulation_id):
+        # Re-measures an entry after it changed, evicting others to fit
+        size = self.simulations[simulation_id].nbytes()
+        self.total_bytes += size - self.sizes[simulation_id]
+        self.sizes[simulation_id] = size
+        while self.total_bytes > self.max_bytes and len(self.simulations) > 1:
+            oldest = next(iter(self.simulations))
+            if oldest == simulation_id:
+                break
+            self.remove(oldest)
+
+    def get(self, simulation_id):
+        self.expire()
+        simulation = self.simulations.get(simulation_id)
+        if simulation is not None:
+            self.simulations.move_to_end(simulation_id)
+            self.last_used[simulation_id] = time.monotonic()
+        return simulation
+
+    def expire(self):
+        # Least recently used first, so the scan stops at the first fresh entry
+        if self.max_idle is None:
+            return
+        cutoff = time.monotonic() - self.max_idle
+        while self.simulations:
+            oldest = next(iter(self.simulations))
+            if self.last_used[oldest] > cutoff:
+                break
+            self.remove(oldest)
+
+    def remove(self, simulation_id):
+        del self.simulations[simulation_id]
+        del self.last_used[simulation_id]
+        self.total_bytes -= self.sizes.pop(simulation_id)
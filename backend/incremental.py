@@ -0,0 +1,82 @@
+# Incremental "what-if" re-runs. Each algorithm keeps checkpoints of its
+# simulator every CHECKPOINT_INTERVAL references. When the trace is edited,
+# the run resumes from the last checkpoint at or before the first changed
+# index, so an edit costs the length of the suffix rather than the trace.
+# State before index d depends only on the prefix, except for decisions that
+# looked past it (OPTIMAL's lookahead), which the policy's horizon records.
+CHECKPOINT_INTERVAL = 512
+
+class Checkpoints(list):
+    def __init__(self, interval=CHECKPOINT_INTERVAL):
+        super().__init__()
+        self.interval = interval
+
+    def wants(self, position):
+        # Each multiple of interval is taken once, even across resumed runs
+        return position % self.interval == 0 and (not self or self[-1]['position'] < position)
+
+    def nbytes(self, frame_count):
+        # Rough: memory and page table copies, plus what each policy snapshot
+        # holds beyond per-frame state (LFU's counts of every page seen)
+        return sum(400 + 120 * frame_count + checkpoint['policy'].nbytes() for checkpoint in self)
+
+def first_difference(old, new):
+    # Compares in blocks so the scan runs at C speed up to the edit
+    limit = min(len(old), len(new))
+    block = 4096
+    start = 0
+    while start < limit and old[start:start + block] == new[start:start + block]:
+        start += block
+    for i in range(start, min(start + block, limit)):
+        if old[i] != new[i]:
+            return i
+    return limit
+
+def resume_point(checkpoints, changed):
+    # Index of the latest checkpoint at or before the edit whose decisions
+    # never looked at it
+    for index in range(len(checkpoints) - 1, -1, -1):
+        checkpoint = checkpoints[index]
+        if checkpoint['position'] <= changed and checkpoint['policy'].horizon < changed:
+            return index
+    return None
+
+class IncrementalSimulation:
+    def __init__(self, simulator_factory, frame_count, algorithms, pff=None, interval=CHECKPOINT_INTERVAL, costs=None):
+        self.frame_count = frame_count
+        self.pff = pff
+        self.costs = costs
+        self.interval = interval
+        self.reference_string = None
+        self.runs = [(algorithm, simulator_factory(), Checkpoints(interval)) for algorithm in algorithms]
+
+    def run(self, reference_string):
+        changed = 0
+        if self.reference_string is not None:
+            changed = first_difference(self.reference_string, reference_string)
+
+        results = []
+        for index, (algorithm, simulator, checkpoints) in enumerate(self.runs):
+            resume_index = resume_point(checkpoints, changed)
+            resume = checkpoints[resume_index] if resume_index is not None else None
+            # Checkpoints from the resume point on are retaken by this run
+            kept = Checkpoints(self.interval)
+            kept.extend(checkpoints[:resume_index or 0])
+            self.runs[index] = (algorithm, simulator, kept)
+            result = simulator.simulate(reference_string, self.frame_count, algorithm, self.pff, checkpoints=kept, resume=resume, costs=self.costs)
+            result['resumed_at'] = resume['position'] if resume is not None else 0
+            results.append(result)
+
+        self.reference_string = list(reference_string)
+        return results
+
+    def nbytes(self):
+        # Rough: history dicts and their memory lists dominate
+        total = 0
+        for _, simulator, checkpoints in self.runs:
+            frames = len(simulator.memory)
+            total += len(simulator.history) * (400 + 16 * frames)
+            total += checkpoints.nbytes(frames)
+            if simulator.policy is not None:
+                total += simulator.policy.nbytes()
+        return total + 8 * len(self.reference_string or ())
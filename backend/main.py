@@ -1,10 +1,46 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict
-from collections import defaultdict
+from typing import List, Dict, Literal, Optional
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
+from array import array
+from policies import DEFAULT_POLICIES, available_policies, get_policy
+import workloads
+import profiling
+import metrics
+import columnar
+from history_store import MAX_STEPS_PER_PAGE, SimulationStore, StoredSimulation
+from incremental import IncrementalSimulation
+from ops import WriteMask
+import costs as cost_model
+import prefetch
+import sessions
+import analysis
+import tiers as tiered
+import cache
+import sampling
+import trace_store
+import results_store
+from compression import CompressionMiddleware
+import time
+import json
+import hashlib
+import orjson
 
-app = FastAPI()
+class ORJSONResponse(JSONResponse):
+    # Results are already plain lists/dicts of builtins, so they go straight to
+    # orjson without a jsonable_encoder pass
+    def render(self, content):
+        try:
+            return orjson.dumps(content)
+        except orjson.JSONEncodeError:
+            # orjson rejects integers outside 64 bits
+            return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Allow CORS for frontend development
 app.add_middleware(
@@ -14,10 +50,145 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added before the instrumentation middleware so response metrics see wire sizes
+app.add_middleware(CompressionMiddleware)
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    # Lets handlers attribute time spent reading and validating the body
+    request.state.received_at = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - request.state.received_at
+    if "server-timing" in response.headers:
+        response.headers["server-timing"] += f", total;dur={elapsed * 1000:.3f}"
+    
+    # Label by route template so IDs in paths don't create new series
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    metrics.REQUEST_LATENCY.observe(path, value=elapsed)
+    if "content-length" in response.headers:
+        metrics.RESPONSE_BYTES.observe(path, value=int(response.headers["content-length"]))
+    return response
+
+class PFFConfig(BaseModel):
+    # Fault-rate thresholds in faults per reference
+    lower: float
+    upper: float
+    min_frames: int = 1
+    max_frames: int
+
+class CostConfig(BaseModel):
+    tlb_hit_ns: float = cost_model.DEFAULTS['tlb_hit_ns']
+    memory_ns: float = cost_model.DEFAULTS['memory_ns']
+    fault_ns: float = cost_model.DEFAULTS['fault_ns']
+    write_back_ns: float = cost_model.DEFAULTS['write_back_ns']
+    tlb_entries: int = cost_model.DEFAULTS['tlb_entries']
+
+class PrefetchConfig(BaseModel):
+    # SEQUENTIAL, STRIDE or MARKOV
+    kind: str
+    # Most pages fetched per reference (the readahead window cap for SEQUENTIAL)
+    degree: int = 4
+    # MARKOV correlation table rows
+    table_size: int = 4096
+
+class WorkloadSpec(BaseModel):
+    model: str
+    length: int
+    pages: int
+    seed: Optional[int] = None
+    params: Dict[str, float] = {}
+
+class GenerateRequest(WorkloadSpec):
+    format: Literal["csv", "binary"] = "csv"
+
 class SimulationRequest(BaseModel):
-    requests: List[int]
+    requests: Optional[List[int]] = None
+    workload: Optional[WorkloadSpec] = None
+    # A trace stored with PUT /traces
+    trace_id: Optional[str] = None
+    frames: int
+    algorithm: str
+    pff: Optional[PFFConfig] = None
+    # Return summaries only; steps are fetched from /simulations/{id}/steps
+    lazy: bool = False
+    # Keep checkpoints so /simulations/{id}/edit can re-run only the suffix
+    incremental: bool = False
+    # One R or W per reference; writes dirty the page's frame
+    ops: Optional[str] = None
+    # Latencies for a simulated clock; adds a 'cost' summary to each result
+    costs: Optional[CostConfig] = None
+    prefetch: Optional[PrefetchConfig] = None
+    # Approximate: simulate only pages sampled at this rate, with frames
+    # scaled to match, and rescale the counts
+    sample_rate: Optional[float] = None
+    # Persist each result for GET /results, with its step history
+    # compressed if save_history is set
+    save: bool = False
+    save_history: bool = False
+
+class EditRequest(BaseModel):
+    # Either the whole new trace, or changes by index and pages to append
+    requests: Optional[List[int]] = None
+    changes: Dict[int, int] = {}
+    append: List[int] = []
+
+class SessionRequest(BaseModel):
+    requests: Optional[List[int]] = None
+    workload: Optional[WorkloadSpec] = None
+    trace_id: Optional[str] = None
+    frames: int
+    algorithm: str
+    pff: Optional[PFFConfig] = None
+
+class SweepRequest(BaseModel):
+    requests: Optional[List[int]] = None
+    workload: Optional[WorkloadSpec] = None
+    trace_id: Optional[str] = None
+    # Faults are computed for every frame count from 1 to max_frames
+    max_frames: int
+    algorithm: str = 'FIFO'
+
+class AnalyzeRequest(BaseModel):
+    # Same trace fields as SimulationRequest; its other fields are ignored
+    requests: Optional[List[int]] = None
+    workload: Optional[WorkloadSpec] = None
+    trace_id: Optional[str] = None
+    top_k: int = 10
+
+class TierConfig(BaseModel):
     frames: int
     algorithm: str
+    latency_ns: float
+
+class TieredRequest(BaseModel):
+    requests: Optional[List[int]] = None
+    workload: Optional[WorkloadSpec] = None
+    trace_id: Optional[str] = None
+    # Fastest first; the last tier's victims go to swap
+    tiers: List[TierConfig]
+    swap_ns: float = tiered.DEFAULT_SWAP_NS
+
+class CacheLevelConfig(BaseModel):
+    sets: int
+    ways: int
+    algorithm: str = 'LRU'
+
+class CacheRequest(BaseModel):
+    # Byte addresses; a generated workload's values are used as addresses
+    requests: Optional[List[int]] = None
+    workload: Optional[WorkloadSpec] = None
+    trace_id: Optional[str] = None
+    line_size: int = 64
+    # L1 first
+    levels: List[CacheLevelConfig]
+    mode: str = 'inclusive'
+
+simulation_store = SimulationStore()
+incremental_store = SimulationStore()
+session_store = SimulationStore(sessions.MAX_BYTES, sessions.MAX_IDLE_SECONDS)
+stored_traces = trace_store.TraceStore()
+stored_results = results_store.ResultsStore()
 
 class PageReplacementSimulator:
     def __init__(self):
@@ -25,51 +196,40 @@ class PageReplacementSimulator:
         self.memory = []
         self.stats = {'hits': 0, 'faults': 0, 'total': 0}
         self.history = []
-        self.access_counts = defaultdict(int)
+        self.policy = None
         self.page_faults = 0
         self.page_table_history = []
+        self.allocation = 0
+        self.allocation_history = []
+        self.last_fault_step = 0
+        self.releases = []
+        self.writes = None
+        self.dirty = None
+        self.write_backs = 0
+        self.costs = None
+        self.prefetching = None
     
-    def initialize_system(self, frame_count):
-        self.memory = [None] * frame_count
+    def initialize_system(self, frame_count, max_frames=None):
+        self.memory = [None] * (max_frames or frame_count)
         self.page_table = {}
         self.stats = {'hits': 0, 'faults': 0, 'total': 0}
         self.history = []
-        self.access_counts = defaultdict(int)
+        self.policy = None
         self.page_faults = 0
         self.page_table_history = []
+        self.allocation = frame_count
+        self.allocation_history = [[0, frame_count]]
+        self.last_fault_step = 0
+        self.releases = []
+        # Per-frame dirty bits, only kept for traces with write ops
+        self.writes = None
+        self.dirty = None
+        self.write_backs = 0
+        self.costs = None
+        self.prefetching = None
     
     def check_page_in_memory(self, page):
-        return page in self.memory
-    
-    def load_page(self, page, index):
-        self.memory[index] = page
-        self.page_table[page] = {
-            'frame': index,
-            'loaded_at': self.stats['total'],
-            'last_used': self.stats['total']
-        }
-        self.access_counts[page] += 1
-    
-    def update_page_table(self, page, frame=None):
-        if frame is not None:
-            self.page_table[page] = {
-                'frame': frame,
-                'loaded_at': self.stats['total'],
-                'last_used': self.stats['total']
-            }
-            self.access_counts[page] += 1
-        else:
-            self.page_table[page]['last_used'] = self.stats['total']
-            self.access_counts[page] += 1
-    
-    def record_hit(self):
-        self.stats['hits'] += 1
-        self.stats['total'] += 1
-    
-    def record_fault(self):
-        self.stats['faults'] += 1
-        self.stats['total'] += 1
-        self.page_faults += 1
+        return page in self.page_table
     
     def calculate_ratios(self):
         return {
@@ -77,58 +237,158 @@ class PageReplacementSimulator:
             'fault_ratio': self.stats['faults'] / self.stats['total'] if self.stats['total'] > 0 else 0
         }
     
-    def simulate(self, reference_string, frame_count, algorithm):
-        self.initialize_system(frame_count)
+    def adjust_allocation(self, pff, step):
+        # Page Fault Frequency: grow when faults come too often, shrink when rare
+        fault_rate = 1 / (step - self.last_fault_step)
+        self.last_fault_step = step
+        action = ''
         
-        for i, page in enumerate(reference_string):
-            if self.check_page_in_memory(page):
-                self.record_hit()
-                if algorithm in ['LRU', 'MRU']:
-                    self.update_page_table(page)
-                self.history.append({
-                    'page': page,
-                    'memory': list(self.memory),
-                    'event': 'hit',
-                    'action': '',
-                    'step': i + 1
-                })
-            else:
-                self.record_fault()
-                if None in self.memory:
-                    frame_index = self.memory.index(None)
-                    self.load_page(page, frame_index)
-                    action = f"Loaded to frame {frame_index}"
-                else:
-                    if algorithm == 'FIFO':
-                        victim_page = self.handle_fifo()
-                    elif algorithm == 'LRU':
-                        victim_page = self.handle_lru()
-                    elif algorithm == 'OPTIMAL':
-                        victim_page = self.handle_optimal(reference_string[i+1:])
-                    elif algorithm == 'LFU':
-                        victim_page = self.handle_lfu()
-                    elif algorithm == 'MRU':
-                        victim_page = self.handle_mru()
-                    elif algorithm == 'MFU':
-                        victim_page = self.handle_mfu()
-                    
-                    frame_index = self.page_table[victim_page]['frame']
-                    action = f"Replaced page {victim_page} (frame {frame_index})"
-                    del self.page_table[victim_page]
-                    self.load_page(page, frame_index)
-                
-                self.history.append({
-                    'page': page,
-                    'memory': list(self.memory),
-                    'event': 'fault',
-                    'action': action,
-                    'step': i + 1
-                })
-            
-            # Record memory state at each step
-            self.page_table_history.append(list(self.memory))
+        if fault_rate > pff.upper and self.allocation < pff.max_frames:
+            self.allocation += 1
+        elif fault_rate < pff.lower and self.allocation > pff.min_frames:
+            self.allocation -= 1
+            if len(self.page_table) > self.allocation:
+                victim_page = self.policy.victim(step)
+                frame_index = self.page_table.pop(victim_page)
+                if self.costs is not None:
+                    self.costs.tlb.pop(victim_page, None)
+                if self.prefetching is not None:
+                    self.prefetching.evicted(victim_page, False)
+                action = f"Released page {victim_page} (frame {frame_index}){self.write_back(frame_index)}; "
+                self.memory[frame_index] = None
+                self.releases.append((step, frame_index))
+        else:
+            return action
         
+        self.allocation_history.append([step, self.allocation])
+        return action
+    
+    def write_back(self, frame_index):
+        # Counts the write-back of a dirty frame about to be reused
+        if self.dirty is None or not self.dirty[frame_index]:
+            return ''
+        self.dirty[frame_index] = False
+        self.write_backs += 1
+        return ', written back'
+    
+    def prefetch(self, page, fault, step):
+        # Loads the prefetcher's candidates through the same allocator as
+        # demand faults; they are asynchronous, so no stall is charged
+        prefetching = self.prefetching
+        useful = prefetching.reference(page, fault)
+        actions = []
+        # Past allocation - 1 pages ahead, loads would evict earlier candidates
+        for candidate in islice(prefetching.prefetcher.observe(page, fault, useful), max(self.allocation - 1, 0)):
+            if candidate in self.page_table:
+                continue
+            if len(self.page_table) < self.allocation:
+                frame_index = self.memory.index(None)
+            else:
+                victim_page = self.policy.victim(step)
+                frame_index = self.page_table.pop(victim_page)
+                if self.costs is not None:
+                    self.costs.tlb.pop(victim_page, None)
+                prefetching.evicted(victim_page, True)
+                actions.append(f"Prefetch replaced page {victim_page} (frame {frame_index}){self.write_back(frame_index)}")
+            self.memory[frame_index] = candidate
+            self.page_table[candidate] = frame_index
+            if self.dirty is not None:
+                self.dirty[frame_index] = False
+            self.policy.on_insert(candidate, step)
+            prefetching.unused.add(candidate)
+            prefetching.issued += 1
+            actions.append(f"Prefetched page {candidate} to frame {frame_index}")
+        return '; '.join(actions)
+    
+    def allocation_summary(self, total_steps):
+        # Integrate the allocation series: frames held multiplied by references served
+        frame_steps = 0
+        for (start, frames), (end, _) in zip(self.allocation_history, self.allocation_history[1:] + [[total_steps, 0]]):
+            frame_steps += frames * (end - start)
         return {
+            'allocation': self.allocation_history,
+            'frame_steps': frame_steps,
+            'average_frames': frame_steps / total_steps if total_steps > 0 else 0
+        }
+    
+    def checkpoint(self, position, hits):
+        # State before reference `position`; list-valued history is truncated
+        # on restore rather than copied here
+        return {
+            'position': position,
+            'hits': hits,
+            'memory': list(self.memory),
+            'page_table': dict(self.page_table),
+            'allocation': self.allocation,
+            'allocation_history': len(self.allocation_history),
+            'last_fault_step': self.last_fault_step,
+            'releases': len(self.releases),
+            'dirty': list(self.dirty) if self.dirty is not None else None,
+            'write_backs': self.write_backs,
+            'costs': self.costs.snapshot() if self.costs is not None else None,
+            'policy': self.policy.snapshot()
+        }
+    
+    def restore(self, checkpoint, reference_string, rebase=True):
+        position = checkpoint['position']
+        self.memory = list(checkpoint['memory'])
+        self.page_table = dict(checkpoint['page_table'])
+        self.allocation = checkpoint['allocation']
+        self.allocation_history = self.allocation_history[:checkpoint['allocation_history']]
+        self.last_fault_step = checkpoint['last_fault_step']
+        self.releases = self.releases[:checkpoint['releases']]
+        self.dirty = list(checkpoint['dirty']) if checkpoint['dirty'] is not None else None
+        self.write_backs = checkpoint['write_backs']
+        self.costs = checkpoint['costs'].snapshot() if checkpoint['costs'] is not None else None
+        self.history = self.history[:position]
+        self.page_table_history = self.page_table_history[:position]
+        self.stats = {'hits': checkpoint['hits'], 'faults': position - checkpoint['hits'], 'total': position}
+        self.policy = checkpoint['policy'].snapshot()
+        if rebase:
+            # Only needed when the trace may have changed since the checkpoint
+            self.policy.rebase(reference_string, position)
+    
+    def segments(self, reference_string, start, stop, interval):
+        if interval is None:
+            whole = start == 0 and stop == len(reference_string)
+            yield start, reference_string if whole else reference_string[start:stop]
+            return
+        # Segment ends fall on multiples of interval, wherever the run starts
+        while start < stop:
+            end = min(stop, (start // interval + 1) * interval)
+            yield start, reference_string[start:end]
+            start = end
+    
+    def start(self, reference_string, frame_count, algorithm, pff=None, writes=None, costs=None, prefetcher=None):
+        if pff is not None:
+            frame_count = min(max(frame_count, pff.min_frames), pff.max_frames)
+            self.initialize_system(frame_count, pff.max_frames)
+        else:
+            self.initialize_system(frame_count)
+        self.policy = get_policy(algorithm)(frame_count, reference_string)
+        if writes is not None:
+            self.writes = writes
+            self.dirty = [False] * len(self.memory)
+        if costs is not None:
+            # The caller's model is a template shared by every run
+            self.costs = costs.snapshot()
+        if prefetcher is not None:
+            self.prefetching = prefetch.Prefetching(prefetcher())
+    
+    def simulate(self, reference_string, frame_count, algorithm, pff=None, record_history=True, timings=None, frame_log=None, checkpoints=None, resume=None, writes=None, costs=None, prefetcher=None):
+        # resume: a checkpoint of an earlier run on this simulator to continue
+        # from instead of starting over
+        # writes: an ops.WriteMask marking which references are writes
+        # costs: a costs.CostModel whose latencies drive a simulated clock
+        # prefetcher: a factory for a prefetch.Prefetcher
+        if resume is not None:
+            self.restore(resume, reference_string)
+        else:
+            self.start(reference_string, frame_count, algorithm, pff, writes, costs, prefetcher)
+        self.advance(reference_string, len(reference_string), pff, record_history, timings, frame_log, checkpoints)
+        
+        result = {
+            'paging_type': 'SINGLE',
             'algorithm': algorithm,
             'total_page_faults': self.page_faults,
             'total_hits': self.stats['hits'],
@@ -138,93 +398,626 @@ class PageReplacementSimulator:
             'page_table': self.page_table_history,
             'final_memory_state': list(self.memory) if self.memory else []
         }
+        if self.dirty is not None:
+            result['total_write_backs'] = self.write_backs
+            result['final_dirty_state'] = list(self.dirty)
+        if self.costs is not None:
+            result['cost'] = self.costs.summary(self.stats['total'])
+        if self.prefetching is not None:
+            result['prefetch'] = self.prefetching.summary(self.page_faults)
+        if pff is not None:
+            result.update(self.allocation_summary(self.stats['total']))
+        return result
     
-    def handle_fifo(self):
-        oldest_page = min(self.page_table.items(), key=lambda x: x[1]['loaded_at'])[0]
-        return oldest_page
-    
-    def handle_lru(self):
-        least_recent = min(self.page_table.items(), key=lambda x: x[1]['last_used'])[0]
-        return least_recent
-    
-    def handle_optimal(self, future_references):
-        farthest_page = None
-        farthest_index = -1
+    def advance(self, reference_string, stop, pff=None, record_history=True, timings=None, frame_log=None, checkpoints=None):
+        # Runs references from the current position up to `stop`.
+        # checkpoints: list with an `interval` attribute that is given a
+        # checkpoint at each multiple of interval the run passes.
+        # Keep everything the loop touches in locals
+        on_hit = self.policy.on_hit
+        on_fault = self.policy.on_fault
+        victim = self.policy.victim
+        on_write = self.policy.on_write
+        writes = self.writes
+        dirty = self.dirty
+        prefetching = self.prefetching
+        costs = self.costs
+        if costs is not None:
+            tlb = costs.tlb
+            tlb_entries = costs.tlb_entries
+            latency_counts = costs.histogram
+            now = costs.clock
+            tlb_hits = costs.tlb_hits
+            hit_ns = costs.tlb_hit_ns + costs.memory_ns
+            miss_ns = hit_ns + costs.memory_ns
+            fault_ns = costs.fault_ns
+            write_back_ns = costs.write_back_ns
+        memory = self.memory
+        page_table = self.page_table
+        allocation = self.allocation
+        record_step = self.history.append
+        record_memory = self.page_table_history.append
+        # Compact alternative to history: the frame loaded at each step, -1 on hits
+        log_frame = frame_log.append if frame_log is not None else None
+        hits = self.stats['hits']
+        step = self.stats['total']
+        history_time = 0.0
+        clock = time.perf_counter if timings is not None else None
+        interval = checkpoints.interval if checkpoints is not None else None
         
-        for page in self.page_table:
-            try:
-                next_use = future_references.index(page)
-            except ValueError:
-                return page
+        for segment_start, segment in self.segments(reference_string, step, stop, interval):
+            if checkpoints is not None and checkpoints.wants(segment_start):
+                if costs is not None:
+                    costs.clock = now
+                    costs.tlb_hits = tlb_hits
+                checkpoints.append(self.checkpoint(segment_start, hits))
+            for i, page in enumerate(segment, segment_start):
+                step = i + 1
+                if page in page_table:
+                    hits += 1
+                    on_hit(page, step)
+                    event = 'hit'
+                    action = ''
+                    frame_index = -1
+                else:
+                    released = ''
+                    write_backs = self.write_backs
+                    if pff is not None:
+                        released = self.adjust_allocation(pff, step)
+                        allocation = self.allocation
+                    
+                    if len(page_table) < allocation:
+                        frame_index = memory.index(None)
+                        action = f"{released}Loaded to frame {frame_index}"
+                    else:
+                        victim_page = victim(step)
+                        frame_index = page_table.pop(victim_page)
+                        action = f"{released}Replaced page {victim_page} (frame {frame_index})"
+                        if costs is not None:
+                            tlb.pop(victim_page, None)
+                        if prefetching is not None:
+                            prefetching.evicted(victim_page, False)
+                        if dirty is not None and dirty[frame_index]:
+                            action += ", written back"
+                            self.write_backs += 1
+                    
+                    memory[frame_index] = page
+                    page_table[page] = frame_index
+                    on_fault(page, step)
+                    event = 'fault'
+                    if dirty is not None:
+                        dirty[frame_index] = False
+                
+                write = dirty is not None and writes[i]
+                if write:
+                    dirty[page_table[page]] = True
+                    on_write(page, step)
+                
+                if costs is not None:
+                    if page in tlb:
+                        tlb.move_to_end(page)
+                        tlb_hits += 1
+                        latency = hit_ns
+                    else:
+                        tlb[page] = True
+                        if len(tlb) > tlb_entries:
+                            tlb.popitem(last=False)
+                        latency = miss_ns
+                    if event == 'fault':
+                        stall = fault_ns + (self.write_backs - write_backs) * write_back_ns
+                        costs.stall += stall
+                        latency += stall
+                    now += latency
+                    latency_counts[latency] = latency_counts.get(latency, 0) + 1
+                
+                if prefetching is not None:
+                    loaded = self.prefetch(page, event == 'fault', step)
+                    if loaded:
+                        action = f"{action}; {loaded}" if action else loaded
             
-            if next_use > farthest_index:
-                farthest_index = next_use
-                farthest_page = page
-        
-        return farthest_page if farthest_page else next(iter(self.page_table))
-    
-    def handle_lfu(self):
-        min_count = min(self.access_counts[p] for p in self.memory if p is not None)
-        candidates = [p for p in self.memory if p is not None and self.access_counts[p] == min_count]
-        
-        if len(candidates) > 1:
-            return min(candidates, key=lambda p: self.page_table[p]['last_used'])
-        return candidates[0]
-    
-    def handle_mru(self):
-        most_recent = max(self.page_table.items(), key=lambda x: x[1]['last_used'])[0]
-        return most_recent
-    
-    def handle_mfu(self):
-        max_count = max(self.access_counts[p] for p in self.memory if p is not None)
-        candidates = [p for p in self.memory if p is not None and self.access_counts[p] == max_count]
+                if log_frame is not None:
+                    log_frame(frame_index)
+                if not record_history:
+                    continue
+                if clock:
+                    started = clock()
+                entry = {
+                    'page': page,
+                    'memory': list(memory),
+                    'event': event,
+                    'action': action,
+                    'step': step
+                }
+                if dirty is not None:
+                    entry['op'] = 'W' if write else 'R'
+                record_step(entry)
+                # Record memory state at each step
+                record_memory(list(memory))
+                if clock:
+                    history_time += clock() - started
         
-        if len(candidates) > 1:
-            return min(candidates, key=lambda p: self.page_table[p]['last_used'])
-        return candidates[0]
+        if timings is not None:
+            timings['history'] = timings.get('history', 0.0) + history_time
+        if costs is not None:
+            costs.clock = now
+            costs.tlb_hits = tlb_hits
+        total = step
+        self.stats = {'hits': hits, 'faults': total - hits, 'total': total}
+        self.page_faults = total - hits
+
+def load_trace(trace_id):
+    pages = stored_traces.load(trace_id)
+    if pages is None:
+        raise ValueError("Unknown trace_id; store the trace with PUT /traces first.")
+    return pages
+
+def resolve_trace(request, timer=None):
+    if request.requests is not None:
+        return request.requests
+    if request.trace_id is not None:
+        return load_trace(request.trace_id).tolist()
+    if request.workload is None:
+        raise ValueError("Provide requests, trace_id or workload.")
+    spec = request.workload
+    with timer.phase('generate') if timer is not None else nullcontext():
+        return workloads.generate(spec.model, spec.length, spec.pages, spec.seed, **spec.params).tolist()
+
+def build_cost_model(config):
+    if config is None:
+        return None
+    return cost_model.CostModel(config.tlb_hit_ns, config.memory_ns, config.fault_ns, config.write_back_ns, config.tlb_entries)
+
+def build_prefetcher(config):
+    # A factory, since each run needs its own prefetcher state
+    if config is None:
+        return None
+    factory = partial(prefetch.create, config.kind, config.degree, config.table_size)
+    factory()
+    return factory
+
+def validate_pff(pff):
+    if pff is None:
+        return
+    if pff.min_frames < 1 or pff.min_frames > pff.max_frames:
+        raise ValueError("Invalid PFF frame bounds. Require 1 <= min_frames <= max_frames.")
+    if pff.lower > pff.upper:
+        raise ValueError("Invalid PFF thresholds. Require lower <= upper.")
 
 @app.post("/simulate")
-async def run_simulation(request: SimulationRequest):
+async def run_simulation(request: SimulationRequest, raw_request: Request):
     simulator = PageReplacementSimulator()
+    modes = profiling.requested_modes(raw_request.headers)
+    timer = profiling.PhaseTimer()
+    timer.add('validate', time.perf_counter() - raw_request.state.received_at)
     
-    valid_algorithms = ['FIFO', 'LRU', 'OPTIMAL', 'LFU', 'MRU', 'MFU', 'ALL']
+    valid_algorithms = available_policies() + ['ALL']
     if request.algorithm.upper() not in valid_algorithms:
-        return {"error": "Invalid algorithm. Choose from FIFO, LRU, OPTIMAL, LFU, MRU, MFU, or ALL."}
+        return {"error": f"Invalid algorithm. Choose from {', '.join(available_policies())}, or ALL."}
     
+    if request.algorithm.upper() == 'ALL':
+        algorithms = DEFAULT_POLICIES
+    else:
+        algorithms = [request.algorithm.upper()]
+    
+    if request.sample_rate is not None:
+        # Checked before resolve_trace, which would build the whole trace
+        try:
+            sampled, length, saved_trace = sample_trace(request, timer)
+        except ValueError as e:
+            return {"error": str(e)}
+        metrics.REQUESTS.inc(request.algorithm.upper())
+        metrics.TRACE_LENGTH.observe(value=length)
+        profiler = profiling.RequestProfiler('simulate') if 'cprofile' in modes else nullcontext()
+        with profiler, timer.phase('simulate'):
+            response = [sampling.estimate(PageReplacementSimulator, sampled, length, request.frames, algo, request.sample_rate) for algo in algorithms]
+        if saved_trace is not None:
+            save_results(request, saved_trace, length, response)
+        return finish_simulation(response, False, len(sampled) * len(algorithms), timer, modes, profiler)
+    
+    try:
+        reference_string = resolve_trace(request, timer)
+        validate_pff(request.pff)
+        writes = WriteMask.parse(request.ops, len(reference_string)) if request.ops is not None else None
+        costs = build_cost_model(request.costs)
+        prefetcher = build_prefetcher(request.prefetch)
+        saved_trace = saved_trace_id(request, reference_string)
+    except ValueError as e:
+        return {"error": str(e)}
+    
+    if request.lazy and request.incremental:
+        return {"error": "lazy and incremental can't be combined."}
+    if writes is not None and (request.lazy or request.incremental):
+        return {"error": "ops can't be combined with lazy or incremental."}
+    if prefetcher is not None and (request.lazy or request.incremental):
+        return {"error": "prefetch can't be combined with lazy or incremental."}
+    if request.save_history and (request.lazy or request.incremental):
+        return {"error": "save_history needs the history, so it can't be combined with lazy or incremental."}
+    
+    metrics.REQUESTS.inc(request.algorithm.upper())
+    metrics.TRACE_LENGTH.observe(value=len(reference_string))
+    # Columnar output rebuilds steps from a frame log, which PFF releases would break
+    columnar_output = not request.lazy and not request.incremental and writes is None and costs is None and prefetcher is None and saved_trace is None and columnar.accepts_columnar(raw_request.headers) and request.pff is None and columnar.can_encode(reference_string)
+    profiler = profiling.RequestProfiler('simulate') if 'cprofile' in modes else nullcontext()
+    timings = timer.phases if 'timing' in modes else None
     response = []
+    with profiler, timer.phase('simulate'):
+        if request.incremental:
+            response = run_incremental(reference_string, request.frames, algorithms, request.pff, costs)
+        else:
+            for algo in algorithms:
+                if request.lazy:
+                    response.append(run_lazy(simulator, reference_string, request.frames, algo, request.pff, costs))
+                elif columnar_output:
+                    frame_log = array('i')
+                    result = simulator.simulate(reference_string, request.frames, algo, record_history=False, timings=timings, frame_log=frame_log)
+                    response.append((algo, reference_string, frame_log, len(simulator.memory), result['total_hits']))
+                else:
+                    # simulate() returns the response shape, so results go out as-is
+                    response.append(simulator.simulate(reference_string, request.frames, algo, request.pff, timings=timings, writes=writes, costs=costs, prefetcher=prefetcher))
+    
+    if saved_trace is not None:
+        save_results(request, saved_trace, len(reference_string), response)
+    return finish_simulation(response, columnar_output, len(reference_string) * len(algorithms), timer, modes, profiler)
+
+def finish_simulation(response, columnar_output, accesses, timer, modes, profiler):
+    # accesses: references actually simulated, summed over algorithms
+    elapsed = timer.phases['simulate']
+    metrics.ACCESSES.inc(amount=accesses)
+    metrics.SIMULATION_SECONDS.inc(amount=elapsed)
+    if elapsed > 0:
+        metrics.THROUGHPUT.observe(value=accesses / elapsed)
+    
+    if not modes:
+        return render_results(response, columnar_output)
+    
+    # Instrumented requests serialize here so encoding time can be attributed
+    timer.phases['simulate'] -= timer.phases.get('history', 0.0)
+    with profiler, timer.phase('serialize'):
+        body = render_results(response, columnar_output)
+    if 'timing' in modes:
+        body.headers['server-timing'] = timer.server_timing()
+    if 'cprofile' in modes:
+        dump = profiler.dump()
+        if dump is not None:
+            body.headers['x-profile-dump'] = dump
+    return body
+
+def sample_trace(request, timer):
+    # Returns the sampled pages, the full trace's length and the trace's ID
+    # in the results store, if saving
+    if request.pff is not None or request.lazy or request.incremental or request.ops is not None or request.costs is not None or request.prefetch is not None or request.save_history:
+        raise ValueError("sample_rate only applies to plain fixed-frame runs.")
+    sampling.validate_rate(request.sample_rate, request.frames)
+    if request.requests is None and request.trace_id is None and request.workload is None:
+        raise ValueError("Provide requests, trace_id or workload.")
+    saved_trace = None
+    # Workloads are generated as they are sampled, so this covers both
+    with timer.phase('sample'):
+        if request.requests is not None:
+            saved_trace = saved_trace_id(request, request.requests)
+            sampled = sampling.sample(request.requests, request.sample_rate).tolist()
+            length = len(request.requests)
+        elif request.trace_id is not None:
+            saved_trace = saved_trace_id(request, None)
+            sampled, length = sampling.sample_chunks(trace_store.chunks(load_trace(request.trace_id)), request.sample_rate)
+        else:
+            spec = request.workload
+            chunks = workloads.stream(spec.model, spec.length, spec.pages, spec.seed, **spec.params)
+            if request.save:
+                # Hashed as it streams past, since the trace is never held whole
+                hasher = hashlib.sha256()
+                chunks = results_store.hashing(chunks, hasher)
+            sampled, length = sampling.sample_chunks(chunks, request.sample_rate)
+            if request.save:
+                saved_trace = hasher.hexdigest()
+    return sampled, length, saved_trace
+
+def saved_trace_id(request, reference_string):
+    # The trace's ID in the results store, or None when nothing is saved
+    if not request.save and not request.save_history:
+        return None
+    if request.trace_id is not None:
+        return request.trace_id
+    return results_store.trace_hash(reference_string)
+
+def save_results(request, trace_id, trace_length, results):
+    # Run settings that distinguish otherwise alike rows
+    options = {name: config.model_dump() for name, config in (('pff', request.pff), ('costs', request.costs), ('prefetch', request.prefetch)) if config is not None}
+    if request.ops is not None:
+        options['ops'] = True
+    if request.sample_rate is not None:
+        options['sample_rate'] = request.sample_rate
+    ids = stored_results.save(trace_id, trace_length, request.frames, options, results, request.save_history)
+    for result, result_id in zip(results, ids):
+        result['result_id'] = result_id
+
+def run_lazy(simulator, reference_string, frame_count, algorithm, pff, costs=None):
+    frame_log = array('i')
+    result = simulator.simulate(reference_string, frame_count, algorithm, pff, record_history=False, frame_log=frame_log, costs=costs)
+    stored = StoredSimulation(reference_string, frame_log, len(simulator.memory), simulator.releases)
+    del result['history'], result['page_table']
+    result['simulation_id'] = simulation_store.add(stored)
+    result['total_steps'] = stored.total_steps
+    return result
+
+def run_incremental(reference_string, frame_count, algorithms, pff, costs=None):
+    run = IncrementalSimulation(PageReplacementSimulator, frame_count, algorithms, pff, costs=costs)
+    results = run.run(reference_string)
+    simulation_id = incremental_store.add(run)
+    for result in results:
+        result['simulation_id'] = simulation_id
+    return results
+
+def render_results(response, columnar_output):
+    if columnar_output:
+        body = Response(columnar.encode(response), media_type=columnar.MEDIA_TYPE)
+    else:
+        body = ORJSONResponse(response)
+    body.headers['vary'] = 'Accept'
+    return body
+
+@app.get("/simulations/{simulation_id}/steps")
+async def simulation_steps(simulation_id: str, start: int = Query(0, alias="from"), stop: Optional[int] = Query(None, alias="to")):
+    stored = simulation_store.get(simulation_id)
+    if stored is None:
+        return JSONResponse({"error": "Unknown or expired simulation ID."}, status_code=404)
+    
+    if stop is None:
+        stop = start + MAX_STEPS_PER_PAGE
+    if start < 0 or stop < start:
+        return {"error": "Invalid step range. Require 0 <= from <= to."}
+    if stop - start > MAX_STEPS_PER_PAGE:
+        return {"error": f"At most {MAX_STEPS_PER_PAGE} steps can be fetched at once."}
+    
+    # Steps are 0-based and half-open: from=0&to=100 returns steps 1-100
+    history = stored.steps(start, stop)
+    return {
+        'simulation_id': simulation_id,
+        'from': start,
+        'to': start + len(history),
+        'total_steps': stored.total_steps,
+        'history': history,
+        'page_table': [entry['memory'] for entry in history]
+    }
+
+@app.post("/simulations/{simulation_id}/edit")
+async def edit_simulation(simulation_id: str, request: EditRequest):
+    run = incremental_store.get(simulation_id)
+    if run is None:
+        return JSONResponse({"error": "Unknown or expired simulation ID."}, status_code=404)
+    
+    if request.requests is not None:
+        reference_string = request.requests
+    else:
+        reference_string = list(run.reference_string)
+        for index, page in request.changes.items():
+            if not 0 <= index < len(reference_string):
+                return {"error": f"Change index {index} is outside the trace."}
+            reference_string[index] = page
+        reference_string.extend(request.append)
+    
+    results = run.run(reference_string)
+    incremental_store.resize(simulation_id)
+    for result in results:
+        result['simulation_id'] = simulation_id
+    return render_results(results, False)
+
+@app.post("/sweep")
+async def sweep_frames(request: SweepRequest):
+    if request.algorithm.upper() not in available_policies() + ['ALL']:
+        return {"error": f"Invalid algorithm. Choose from {', '.join(available_policies())}, or ALL."}
+    if not 1 <= request.max_frames <= analysis.MAX_FRAMES:
+        return {"error": f"max_frames must be between 1 and {analysis.MAX_FRAMES}."}
+    try:
+        reference_string = resolve_trace(request)
+    except ValueError as e:
+        return {"error": str(e)}
     
     if request.algorithm.upper() == 'ALL':
-        algorithms = ['FIFO', 'LRU', 'OPTIMAL', 'LFU', 'MRU', 'MFU']
-        for algo in algorithms:
-            result = simulator.simulate(request.requests, request.frames, algo)
-            response.append({
-                "paging_type": "SINGLE",
-                "algorithm": algo,
-                "total_page_faults": result['total_page_faults'],
-                "total_hits": result['total_hits'],
-                "hit_ratio": result['hit_ratio'],
-                "fault_ratio": result['fault_ratio'],
-                "history": result['history'],
-                "page_table": result['page_table'],
-                "final_memory_state": result['final_memory_state']
-            })
-        
+        algorithms = DEFAULT_POLICIES
     else:
-        result = simulator.simulate(request.requests, request.frames, request.algorithm.upper())
-        
-        response.append({
-            "paging_type": "SINGLE",
-            "algorithm": request.algorithm.upper(),
-            "total_page_faults": result['total_page_faults'],
-            "total_hits": result['total_hits'],
-            "hit_ratio": result['hit_ratio'],
-            "fault_ratio": result['fault_ratio'],
-            "history": result['history'],
-            "page_table": result['page_table'],
-            "final_memory_state": result['final_memory_state']
-        })
+        algorithms = [request.algorithm.upper()]
+    return analysis.sweep(PageReplacementSimulator, reference_string, request.max_frames, algorithms)
+
+@app.post("/tiered")
+async def simulate_tiered(request: TieredRequest):
+    try:
+        reference_string = resolve_trace(request)
+        tiered.validate_tiers(request.tiers, request.swap_ns)
+    except ValueError as e:
+        return {"error": str(e)}
+    return tiered.simulate_tiers(reference_string, request.tiers, request.swap_ns)
+
+@app.post("/cache")
+async def simulate_cache(request: CacheRequest):
+    try:
+        addresses = resolve_trace(request)
+        mode = request.mode.lower()
+        cache.validate_levels(request.levels, request.line_size, mode)
+        return cache.simulate_cache(addresses, request.line_size, request.levels, mode)
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.post("/analyze")
+async def analyze_trace(request: AnalyzeRequest):
+    if not 0 <= request.top_k <= analysis.MAX_TOP_K:
+        return {"error": f"top_k must be between 0 and {analysis.MAX_TOP_K}."}
     
-    return response
+    if request.requests is not None:
+        profile = analysis.TraceProfile(len(request.requests), request.top_k)
+        profile.update(request.requests)
+    elif request.trace_id is not None:
+        try:
+            pages = load_trace(request.trace_id)
+        except ValueError as e:
+            return {"error": str(e)}
+        profile = analysis.TraceProfile(len(pages), request.top_k)
+        for chunk in trace_store.chunks(pages):
+            profile.update(chunk.tolist())
+    elif request.workload is not None:
+        # Generated traces are profiled chunk by chunk, never held whole
+        spec = request.workload
+        profile = analysis.TraceProfile(spec.length, request.top_k)
+        try:
+            for chunk in workloads.stream(spec.model, spec.length, spec.pages, spec.seed, **spec.params):
+                profile.update(chunk.tolist())
+        except ValueError as e:
+            return {"error": str(e)}
+    else:
+        return {"error": "Provide requests, trace_id or workload."}
+    return profile.result()
+
+@app.post("/sessions")
+async def create_session(request: SessionRequest):
+    algorithm = request.algorithm.upper()
+    if algorithm not in available_policies():
+        return {"error": f"Invalid algorithm. Choose from {', '.join(available_policies())}."}
+    if request.frames < 1:
+        return {"error": "frames must be at least 1."}
+    try:
+        reference_string = resolve_trace(request)
+        validate_pff(request.pff)
+    except ValueError as e:
+        return {"error": str(e)}
+    
+    session = sessions.Session(PageReplacementSimulator(), reference_string, request.frames, algorithm, request.pff)
+    session_id = session_store.add(session)
+    return session_response(session_id, session, [])
+
+def session_response(session_id, session, history):
+    session_store.resize(session_id)
+    return {'session_id': session_id, **session.state(), 'history': history}
+
+def session_or_404(session_id):
+    session = session_store.get(session_id)
+    if session is None:
+        return None, JSONResponse({"error": "Unknown or expired session ID."}, status_code=404)
+    return session, None
+
+@app.post("/sessions/{session_id}/step")
+async def step_session(session_id: str, count: int = 1):
+    session, missing = session_or_404(session_id)
+    if missing is not None:
+        return missing
+    if not 1 <= count <= MAX_STEPS_PER_PAGE:
+        return {"error": f"count must be between 1 and {MAX_STEPS_PER_PAGE}."}
+    return session_response(session_id, session, session.step(count))
+
+@app.post("/sessions/{session_id}/back")
+async def back_session(session_id: str, count: int = 1):
+    session, missing = session_or_404(session_id)
+    if missing is not None:
+        return missing
+    if count < 1:
+        return {"error": "count must be at least 1."}
+    return session_response(session_id, session, session.back(count))
+
+@app.post("/sessions/{session_id}/seek")
+async def seek_session(session_id: str, position: int):
+    session, missing = session_or_404(session_id)
+    if missing is not None:
+        return missing
+    return session_response(session_id, session, session.seek(position))
+
+@app.delete("/sessions/{session_id}")
+async def close_session(session_id: str):
+    session, missing = session_or_404(session_id)
+    if missing is not None:
+        return missing
+    session_store.remove(session_id)
+    return {'session_id': session_id, 'closed': True}
+
+@app.put("/traces")
+async def put_trace(raw_request: Request):
+    # The body is the trace itself: JSON array, comma or whitespace
+    # separated text, or little-endian int64 as /generate returns
+    try:
+        pages = trace_store.parse_upload(await raw_request.body(), raw_request.headers.get("content-type"))
+        trace_id, created = stored_traces.put(pages)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {**stored_traces.info(trace_id), 'created': created}
+
+def trace_or_404(trace_id):
+    info = stored_traces.info(trace_id)
+    if info is None:
+        return None, JSONResponse({"error": "Unknown trace ID."}, status_code=404)
+    return info, None
+
+@app.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    info, missing = trace_or_404(trace_id)
+    if missing is not None:
+        return missing
+    return info
+
+@app.delete("/traces/{trace_id}")
+async def delete_trace(trace_id: str):
+    info, missing = trace_or_404(trace_id)
+    if missing is not None:
+        return missing
+    stored_traces.delete(trace_id)
+    return {'trace_id': trace_id, 'deleted': True}
+
+@app.get("/results")
+async def query_results(trace_hash: Optional[str] = None, algorithm: Optional[str] = None, frames: Optional[int] = None,
+                        min_frames: Optional[int] = None, max_frames: Optional[int] = None, paging_type: Optional[str] = None,
+                        approximate: Optional[bool] = None, since: Optional[float] = None, group_by: Optional[str] = None,
+                        limit: int = 100, offset: int = 0):
+    # Saved runs, newest first; with group_by (comma-separated columns, or
+    # empty for one group) the matching runs are aggregated instead
+    filters = {
+        'trace_hash': trace_hash,
+        'algorithm': algorithm.upper() if algorithm is not None else None,
+        'frames': frames,
+        'min_frames': min_frames,
+        'max_frames': max_frames,
+        'paging_type': paging_type.upper() if paging_type is not None else None,
+        'approximate': approximate,
+        'since': since
+    }
+    try:
+        if group_by is not None:
+            return stored_results.aggregate(filters, [column.strip() for column in group_by.split(",") if column.strip()])
+        return stored_results.query(filters, limit, offset)
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.get("/results/{result_id}")
+async def get_result(result_id: int, history: bool = False):
+    result = stored_results.get(result_id, history)
+    if result is None:
+        return JSONResponse({"error": "Unknown result ID."}, status_code=404)
+    return result
+
+@app.get("/metrics")
+async def expose_metrics():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.post("/generate")
+async def generate_workload(request: GenerateRequest):
+    try:
+        chunks = workloads.stream(request.model, request.length, request.pages, request.seed, **request.params)
+        first = next(chunks, None)
+    except ValueError as e:
+        return {"error": str(e)}
+    
+    def with_first(chunks):
+        if first is not None:
+            yield first
+        yield from chunks
+    
+    if request.format == "binary":
+        # Little-endian int64 pages, back to back
+        body = (chunk.astype('<i8').tobytes() for chunk in with_first(chunks))
+        return StreamingResponse(body, media_type="application/octet-stream")
+    
+    def csv_body():
+        separator = ""
+        for chunk in with_first(chunks):
+            yield separator + ",".join(map(str, chunk.tolist()))
+            separator = ","
+    return StreamingResponse(csv_body(), media_type="text/plain")
 
 if __name__ == "__main__":
     import uvicorn
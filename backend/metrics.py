@@ -0,0 +1,101 @@
+import bisect
+
+# Minimal Prometheus text exposition (format 0.0.4) without external
+# dependencies. Handlers are async and update metrics from the event loop
+# thread only, so plain integer updates need no locking.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = []
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        if not self.labelnames:
+            self.values[()] = self.initial()
+        REGISTRY.append(self)
+
+    def initial(self):
+        return 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labelvalues, value in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def set(self, *labelvalues, value):
+        self.values[labelvalues] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets, labelnames=()):
+        self.buckets = sorted(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def initial(self):
+        # Per-bucket (non-cumulative) counts, then sum and count
+        return [[0] * (len(self.buckets) + 1), 0, 0]
+
+    def observe(self, *labelvalues, value):
+        state = self.values.get(labelvalues)
+        if state is None:
+            state = self.values[labelvalues] = self.initial()
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labelvalues, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, [('le', _number(float(bound)))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {count}")
+        return lines
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+SIZE_BUCKETS = [10**exponent for exponent in range(1, 10)]
+
+REQUESTS = Counter("simulation_requests_total", "Simulation requests by requested algorithm.", ["algorithm"])
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.", LATENCY_BUCKETS, ["path"])
+RESPONSE_BYTES = Histogram("http_response_size_bytes", "HTTP response body size by route.", SIZE_BUCKETS, ["path"])
+TRACE_LENGTH = Histogram("simulation_trace_length", "Reference string length per simulation request.", SIZE_BUCKETS)
+ACCESSES = Counter("simulation_accesses_total", "References simulated across all algorithms.")
+SIMULATION_SECONDS = Counter("simulation_seconds_total", "Time spent inside simulation loops.")
+THROUGHPUT = Histogram("simulation_accesses_per_second", "Simulated references per second per request.", [10**exponent for exponent in range(3, 9)])
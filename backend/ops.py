@@ -0,0 +1,33 @@
+# Read/write operations for a trace, one bit per reference (set for a write),
+# packed eight to a byte so op-annotated traces cost n/8 extra bytes
+READ = 'R'
+WRITE = 'W'
+
+class WriteMask:
+    def __init__(self, bits, length):
+        self.bits = bits
+        self.length = length
+
+    @classmethod
+    def parse(cls, ops, length):
+        # ops: one 'R' or 'W' (either case) per reference
+        if len(ops) != length:
+            raise ValueError(f"ops must have one entry per reference ({length}), got {len(ops)}.")
+        raw = ops.upper().encode('ascii', 'replace')
+        if raw.count(b'R') + raw.count(b'W') != length:
+            raise ValueError("ops may only contain R and W.")
+        bits = bytearray((length + 7) // 8)
+        i = raw.find(b'W')
+        while i >= 0:
+            bits[i >> 3] |= 1 << (i & 7)
+            i = raw.find(b'W', i + 1)
+        return cls(bits, length)
+
+    def __getitem__(self, i):
+        return self.bits[i >> 3] >> (i & 7) & 1
+
+    def writes(self):
+        return sum(bin(byte).count('1') for byte in self.bits)
+
+    def nbytes(self):
+        return len(self.bits)
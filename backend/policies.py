@@ -0,0 +1,531 @@
+import bisect
+import copy
+import heapq
+import logging
+from collections import OrderedDict, defaultdict
+from importlib.metadata import entry_points
+
+# Third-party packages expose Policy subclasses under this entry point group
+ENTRY_POINT_GROUP = "page_replacement.policies"
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICIES = ['FIFO', 'LRU', 'OPTIMAL', 'LFU', 'MRU', 'MFU']
+
+POLICIES = {}
+_entry_points_loaded = False
+
+def register_policy(cls):
+    POLICIES[cls.name.upper()] = cls
+    return cls
+
+def load_entry_point_policies():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        # A broken plugin shouldn't take the built-in policies down with it
+        try:
+            cls = entry_point.load()
+        except Exception:
+            logger.exception("Skipping policy entry point %s", entry_point.name)
+            continue
+        POLICIES.setdefault(entry_point.name.upper(), cls)
+
+def get_policy(name):
+    load_entry_point_policies()
+    return POLICIES.get(name.upper())
+
+def available_policies():
+    load_entry_point_policies()
+    return list(POLICIES)
+
+class Policy:
+    # Hooks are bound once per run; `step` is the 1-based position in the trace.
+    # victim() is only called when every frame is occupied and must forget the
+    # page it returns.
+    name = None
+    # Largest trace index a victim choice so far has looked at. Online policies
+    # never look ahead; policies that read ahead in reference_string must raise
+    # it, since incremental re-runs only resume from snapshots taken before
+    # any decision that could see the edit.
+    horizon = -1
+    # True if, after a reference, further hits on the same page only matter
+    # through the last one's step; cache runs then fold back-to-back
+    # references to a line into one
+    folds_repeats = False
+
+    def __init__(self, frame_count, reference_string):
+        self.frame_count = frame_count
+
+    def snapshot(self):
+        # A copy that later hooks on either object can't affect
+        return copy.deepcopy(self)
+
+    def nbytes(self):
+        # Rough size of a snapshot beyond per-frame state, which checkpoint
+        # owners already count; only state that outgrows the frames matters
+        return 0
+
+    def rebase(self, reference_string, position):
+        # Called on a snapshot resumed at `position` of an edited trace
+        pass
+
+    def on_hit(self, page, step):
+        pass
+
+    def on_fault(self, page, step):
+        pass
+
+    def on_write(self, page, step):
+        # Only called for traces with write ops, after on_hit/on_fault
+        pass
+
+    def on_insert(self, page, step):
+        # A page loaded at `step` without being referenced there (prefetched,
+        # or demoted from a faster tier); by default it counts as a demand load
+        self.on_fault(page, step)
+
+    def on_remove(self, page, step):
+        # Forget a resident page that leaves other than as victim(), e.g.
+        # when a tiered run promotes it; policies without it can't be tiers
+        raise NotImplementedError
+
+    def victim(self, step):
+        raise NotImplementedError
+
+# The DEFAULT_POLICIES are mirrored in frontend/src/simulator/policies.js for
+# client-side runs; victim choices, tie-breaks included, must stay in step.
+@register_policy
+class FIFOPolicy(Policy):
+    name = 'FIFO'
+    folds_repeats = True
+
+    def __init__(self, frame_count, reference_string):
+        super().__init__(frame_count, reference_string)
+        self.queue = OrderedDict()
+
+    def snapshot(self):
+        clone = copy.copy(self)
+        clone.queue = self.queue.copy()
+        return clone
+
+    def on_fault(self, page, step):
+        self.queue[page] = step
+
+    def on_remove(self, page, step):
+        del self.queue[page]
+
+    def victim(self, step):
+        return self.queue.popitem(last=False)[0]
+
+@register_policy
+class LRUPolicy(Policy):
+    name = 'LRU'
+    folds_repeats = True
+
+    def __init__(self, frame_count, reference_string):
+        super().__init__(frame_count, reference_string)
+        self.recency = OrderedDict()
+
+    def snapshot(self):
+        clone = copy.copy(self)
+        clone.recency = self.recency.copy()
+        return clone
+
+    def on_hit(self, page, step):
+        self.recency.move_to_end(page)
+
+    def on_fault(self, page, step):
+        self.recency[page] = step
+
+    def on_remove(self, page, step):
+        del self.recency[page]
+
+    def victim(self, step):
+        return self.recency.popitem(last=False)[0]
+
+@register_policy
+class MRUPolicy(LRUPolicy):
+    name = 'MRU'
+
+    def victim(self, step):
+        return self.recency.popitem(last=True)[0]
+
+def clean_first(order, dirty, window):
+    # Removes and returns the first clean page among the first `window` of
+    # `order`, or its first page if they are all dirty
+    chosen = None
+    for i, page in enumerate(order):
+        if i == window:
+            break
+        if page not in dirty:
+            chosen = page
+            break
+    if chosen is None:
+        chosen = next(iter(order))
+    del order[chosen]
+    dirty.discard(chosen)
+    return chosen
+
+@register_policy
+class CleanFIFOPolicy(FIFOPolicy):
+    # FIFO that skips over written pages to the oldest clean one, since a
+    # dirty victim costs a write-back; falls back to plain FIFO when every
+    # resident page is dirty. Pages stay dirty until evicted.
+    name = 'CLEAN_FIFO'
+
+    def __init__(self, frame_count, reference_string):
+        super().__init__(frame_count, reference_string)
+        self.dirty = set()
+
+    def snapshot(self):
+        clone = super().snapshot()
+        clone.dirty = set(self.dirty)
+        return clone
+
+    def on_write(self, page, step):
+        self.dirty.add(page)
+
+    def on_remove(self, page, step):
+        super().on_remove(page, step)
+        self.dirty.discard(page)
+
+    def victim(self, step):
+        return clean_first(self.queue, self.dirty, self.frame_count)
+
+@register_policy
+class CleanLRUPolicy(LRUPolicy):
+    # Clean-first LRU (CFLRU): the least recently used half of the frames is
+    # a clean-first region, searched for a clean victim before taking the
+    # LRU page
+    name = 'CLEAN_LRU'
+
+    def __init__(self, frame_count, reference_string):
+        super().__init__(frame_count, reference_string)
+        self.dirty = set()
+        self.window = max(1, frame_count // 2)
+
+    def snapshot(self):
+        clone = super().snapshot()
+        clone.dirty = set(self.dirty)
+        return clone
+
+    def on_write(self, page, step):
+        self.dirty.add(page)
+
+    def on_remove(self, page, step):
+        super().on_remove(page, step)
+        self.dirty.discard(page)
+
+    def victim(self, step):
+        return clean_first(self.recency, self.dirty, self.window)
+
+@register_policy
+class LFUPolicy(Policy):
+    # Counts are per load and survive eviction; ties go to the earliest loaded
+    # page. A page's key is fixed while it is resident, so a heap suffices;
+    # entries of removed pages are skipped lazily.
+    name = 'LFU'
+    folds_repeats = True
+    sign = 1
+
+    def __init__(self, frame_count, reference_string):
+        super().__init__(frame_count, reference_string)
+        self.access_counts = defaultdict(int)
+        self.heap = []
+        self.entries = {}
+
+    def snapshot(self):
+        clone = copy.copy(self)
+        clone.access_counts = self.access_counts.copy()
+        clone.heap = list(self.heap)
+        clone.entries = dict(self.entries)
+        return clone
+
+    def nbytes(self):
+        # Every snapshot copies the count of each page seen so far
+        return 40 * len(self.access_counts)
+
+    def on_fault(self, page, step):
+        self.access_counts[page] += 1
+        entry = (self.sign * self.access_counts[page], step, page)
+        self.entries[page] = entry
+        heapq.heappush(self.heap, entry)
+
+    def on_remove(self, page, step):
+        del self.entries[page]
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = list(self.entries.values())
+            heapq.heapify(self.heap)
+
+    def victim(self, step):
+        heap = self.heap
+        entries = self.entries
+        while True:
+            entry = heapq.heappop(heap)
+            if entries.get(entry[2]) is entry:
+                del entries[entry[2]]
+                return entry[2]
+
+@register_policy
+class MFUPolicy(LFUPolicy):
+    name = 'MFU'
+    sign = -1
+
+@register_policy
+class OptimalPolicy(Policy):
+    # Evicts the resident page whose next use is farthest away, preferring the
+    # earliest loaded page among those never used again. Heap entries go stale
+    # when a page is hit and are skipped lazily.
+    name = 'OPTIMAL'
+    folds_repeats = True
+
+    def __init__(self, frame_count, reference_string):
+        super().__init__(frame_count, reference_string)
+        self.never = len(reference_string)
+        self.next_use = self.compute_next_use(reference_string)
+        self.reference_string = reference_string
+        # Per-page positions, built only if on_insert needs them. The holder
+        # is shared by snapshots, so sets of a cache level index the trace once
+        self.occurrences = [None]
+        self.resident = {}
+        self.heap = []
+
+    def compute_next_use(self, reference_string):
+        next_use = [self.never] * len(reference_string)
+        self.fill_next_use(reference_string, 0, next_use)
+        return next_use
+
+    def fill_next_use(self, reference_string, position, next_use):
+        # Fills next_use from `position` on and returns each page's first use
+        # at or after it
+        seen = {}
+        for i in range(len(reference_string) - 1, position - 1, -1):
+            page = reference_string[i]
+            next_use[i] = seen.get(page, self.never)
+            seen[page] = i
+        return seen
+
+    def snapshot(self):
+        # next_use is never mutated, only replaced, so it can be shared
+        clone = copy.copy(self)
+        clone.resident = dict(self.resident)
+        clone.heap = list(self.heap)
+        return clone
+
+    def rebase(self, reference_string, position):
+        # Uses before `position` are unchanged; recompute the rest and re-key
+        # resident pages by their next use in the new trace
+        self.never = len(reference_string)
+        self.reference_string = reference_string
+        # A new holder: snapshots of the old trace keep theirs
+        self.occurrences = [None]
+        next_use = self.next_use[:position]
+        next_use.extend([self.never] * (self.never - position))
+        first_use = self.fill_next_use(reference_string, position, next_use)
+        self.next_use = next_use
+        self.resident = {page: (first_use.get(page, self.never), loaded_at) for page, (_, loaded_at) in self.resident.items()}
+        self.heap = [(-nxt, loaded_at, page) for page, (nxt, loaded_at) in self.resident.items()]
+        heapq.heapify(self.heap)
+
+    def on_hit(self, page, step):
+        nxt = self.next_use[step - 1]
+        loaded_at = self.resident[page][1]
+        self.resident[page] = (nxt, loaded_at)
+        heapq.heappush(self.heap, (-nxt, loaded_at, page))
+        if len(self.heap) > 2 * len(self.resident) + 64:
+            self.heap = [(-nxt, loaded_at, page) for page, (nxt, loaded_at) in self.resident.items()]
+            heapq.heapify(self.heap)
+
+    def on_fault(self, page, step):
+        nxt = self.next_use[step - 1]
+        self.resident[page] = (nxt, step)
+        heapq.heappush(self.heap, (-nxt, step, page))
+
+    def on_insert(self, page, step):
+        # The page wasn't referenced at `step`, so its next use comes from
+        # its own positions rather than next_use
+        occurrences = self.occurrences[0]
+        if occurrences is None:
+            occurrences = self.occurrences[0] = defaultdict(list)
+            for i, referenced in enumerate(self.reference_string):
+                occurrences[referenced].append(i)
+        positions = occurrences.get(page, ())
+        index = bisect.bisect_left(positions, step)
+        nxt = positions[index] if index < len(positions) else self.never
+        self.resident[page] = (nxt, step)
+        heapq.heappush(self.heap, (-nxt, step, page))
+
+    def on_remove(self, page, step):
+        del self.resident[page]
+
+    def victim(self, step):
+        heap = self.heap
+        resident = self.resident
+        while True:
+            nxt, loaded_at, page = heapq.heappop(heap)
+            if resident.get(page) == (-nxt, loaded_at):
+                del resident[page]
+                # The choice compared next uses up to this one
+                if -nxt > self.horizon:
+                    self.horizon = -nxt
+                return page
+
+# Sketch indexes come from one 64-bit multiply-xorshift mix of the page:
+# slot i is h1 + i * h2 (Kirsch and Mitzenmacher), so the same hash serves
+# every row and the doorkeeper
+HASH_MASK = (1 << 64) - 1
+SKETCH_DEPTH = 4
+COUNTER_MAX = 15
+HALVE = bytes(count >> 1 for count in range(256))
+
+class FrequencySketch:
+    # Approximate reference counts in memory fixed by `width`, whatever the
+    # number of distinct pages: a count-min sketch of 4-bit counters (one per
+    # byte) behind a doorkeeper bloom filter that absorbs each page's first
+    # reference, so one-off pages never reach the counters. Every
+    # `sample_size` references all counters halve and the doorkeeper clears,
+    # which ages out past popularity.
+    def __init__(self, width):
+        bits = max(4, (width - 1).bit_length())
+        self.width = 1 << bits
+        self.mask = self.width - 1
+        self.counters = bytearray(SKETCH_DEPTH * self.width)
+        # 32 bits per counter slot keeps two-probe false positives low over
+        # a sample of up to 10 distinct pages per slot
+        self.doorkeeper = bytearray(4 * self.width)
+        self.doorkeeper_mask = 8 * len(self.doorkeeper) - 1
+        self.sample_size = 10 * self.width
+        self.additions = 0
+        self.resets = 0
+
+    def copy(self):
+        clone = copy.copy(self)
+        clone.counters = bytearray(self.counters)
+        clone.doorkeeper = bytearray(self.doorkeeper)
+        return clone
+
+    def nbytes(self):
+        return len(self.counters) + len(self.doorkeeper)
+
+    def increment(self, page):
+        # The hash is inlined; this runs on every reference
+        h = (page * 0x9E3779B97F4A7C15) & HASH_MASK
+        h = ((h ^ (h >> 31)) * 0xBF58476D1CE4E5B9) & HASH_MASK
+        h1 = h >> 32
+        h2 = (h & 0xFFFFFFFF) | 1
+        doorkeeper = self.doorkeeper
+        a = (h1 + 4 * h2) & self.doorkeeper_mask
+        b = (h1 + 5 * h2) & self.doorkeeper_mask
+        if doorkeeper[a >> 3] >> (a & 7) & 1 and doorkeeper[b >> 3] >> (b & 7) & 1:
+            counters = self.counters
+            mask = self.mask
+            width = self.width
+            for slot in (h1 & mask, width + ((h1 + h2) & mask), 2 * width + ((h1 + 2 * h2) & mask), 3 * width + ((h1 + 3 * h2) & mask)):
+                if counters[slot] < COUNTER_MAX:
+                    counters[slot] += 1
+        else:
+            doorkeeper[a >> 3] |= 1 << (a & 7)
+            doorkeeper[b >> 3] |= 1 << (b & 7)
+        self.additions += 1
+        if self.additions == self.sample_size:
+            self.counters = self.counters.translate(HALVE)
+            self.doorkeeper = bytearray(len(self.doorkeeper))
+            self.additions //= 2
+            self.resets += 1
+
+    def frequency(self, page):
+        h = (page * 0x9E3779B97F4A7C15) & HASH_MASK
+        h = ((h ^ (h >> 31)) * 0xBF58476D1CE4E5B9) & HASH_MASK
+        h1 = h >> 32
+        h2 = (h & 0xFFFFFFFF) | 1
+        counters = self.counters
+        mask = self.mask
+        width = self.width
+        count = min(counters[h1 & mask], counters[width + ((h1 + h2) & mask)], counters[2 * width + ((h1 + 2 * h2) & mask)], counters[3 * width + ((h1 + 3 * h2) & mask)])
+        doorkeeper = self.doorkeeper
+        a = (h1 + 4 * h2) & self.doorkeeper_mask
+        b = (h1 + 5 * h2) & self.doorkeeper_mask
+        if doorkeeper[a >> 3] >> (a & 7) & 1 and doorkeeper[b >> 3] >> (b & 7) & 1:
+            count += 1
+        return count
+
+@register_policy
+class WTinyLFUPolicy(Policy):
+    # W-TinyLFU (Einziger et al., 2017). New pages enter a small LRU window
+    # (1% of the frames); the rest is a segmented LRU main region, where a
+    # page hit in probation moves to protected (80%). When memory is full the
+    # window's LRU page competes for the main region against its victim, and
+    # the one the sketch estimates as less frequent is evicted. Unlike LFU,
+    # frequency state is bounded by the frame count, not the trace.
+    name = 'W_TINYLFU'
+
+    def __init__(self, frame_count, reference_string):
+        super().__init__(frame_count, reference_string)
+        self.window_size = max(1, frame_count // 100)
+        main_size = frame_count - self.window_size
+        self.protected_size = main_size * 4 // 5
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = FrequencySketch(frame_count)
+
+    def snapshot(self):
+        clone = copy.copy(self)
+        clone.window = self.window.copy()
+        clone.probation = self.probation.copy()
+        clone.protected = self.protected.copy()
+        clone.sketch = self.sketch.copy()
+        return clone
+
+    def nbytes(self):
+        return self.sketch.nbytes()
+
+    def on_hit(self, page, step):
+        self.sketch.increment(page)
+        protected = self.protected
+        if page in protected:
+            protected.move_to_end(page)
+        elif page in self.window:
+            self.window.move_to_end(page)
+        else:
+            del self.probation[page]
+            protected[page] = None
+            if len(protected) > self.protected_size:
+                self.probation[protected.popitem(last=False)[0]] = None
+
+    def on_fault(self, page, step):
+        self.sketch.increment(page)
+        window = self.window
+        window[page] = None
+        if len(window) > self.window_size:
+            # Memory isn't full yet, so the main region has room
+            self.probation[window.popitem(last=False)[0]] = None
+
+    def on_remove(self, page, step):
+        for segment in (self.window, self.probation, self.protected):
+            if page in segment:
+                del segment[page]
+                return
+
+    def victim(self, step):
+        window = self.window
+        main = self.probation or self.protected
+        if len(window) < self.window_size:
+            # Pages were removed from the window; it takes the next one
+            # without pushing a candidate out
+            return (main or window).popitem(last=False)[0]
+        candidate = next(iter(window))
+        if not main:
+            del window[candidate]
+            return candidate
+        incumbent = next(iter(main))
+        # Ties keep the incumbent, so a scan can't flush the main region
+        del window[candidate]
+        if self.sketch.frequency(candidate) > self.sketch.frequency(incumbent):
+            del main[incumbent]
+            self.probation[candidate] = None
+            return incumbent
+        return candidate
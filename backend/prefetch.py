@@ -0,0 +1,151 @@
+from collections import OrderedDict
+
+# Prefetchers watch the demand stream and name pages to load ahead of use.
+# observe() is called once per reference with whether it faulted and whether
+# it hit a page that was prefetched and not yet used; it returns at most a
+# bounded number of candidates, so bookkeeping is O(1) per access.
+PREFETCHERS = {}
+
+def register_prefetcher(cls):
+    PREFETCHERS[cls.name] = cls
+    return cls
+
+def create(kind, degree=4, table_size=4096):
+    cls = PREFETCHERS.get(kind.upper())
+    if cls is None:
+        raise ValueError(f"Invalid prefetcher. Choose from {', '.join(PREFETCHERS)}.")
+    if degree < 1:
+        raise ValueError("Prefetch degree must be at least 1.")
+    if table_size < 1:
+        raise ValueError("Prefetch table_size must be at least 1.")
+    return cls(degree, table_size)
+
+class Prefetcher:
+    name = None
+
+    def __init__(self, degree, table_size):
+        self.degree = degree
+
+    def observe(self, page, fault, useful):
+        raise NotImplementedError
+
+@register_prefetcher
+class SequentialPrefetcher(Prefetcher):
+    # Readahead that keeps the next `window` pages of a sequential stream
+    # resident (pages already in memory are skipped by the caller). The
+    # window doubles when prefetched pages get used, up to degree, halves
+    # when the stream faults anyway, and resets when the stream breaks.
+    name = 'SEQUENTIAL'
+
+    def __init__(self, degree, table_size):
+        super().__init__(degree, table_size)
+        self.window = 1
+        self.last = None
+
+    def observe(self, page, fault, useful):
+        sequential = self.last is not None and page == self.last + 1
+        self.last = page
+        if not sequential:
+            self.window = 1
+            return ()
+        if useful:
+            self.window = min(2 * self.window, self.degree)
+        elif fault:
+            self.window = max(1, self.window // 2)
+        return range(page + 1, page + self.window + 1)
+
+@register_prefetcher
+class StridePrefetcher(Prefetcher):
+    # Once the same non-zero stride is seen twice in a row, fetches the next
+    # `degree` pages along it
+    name = 'STRIDE'
+
+    def __init__(self, degree, table_size):
+        super().__init__(degree, table_size)
+        self.last = None
+        self.stride = 0
+        self.confirmed = False
+
+    def observe(self, page, fault, useful):
+        if self.last is None:
+            self.last = page
+            return ()
+        stride = page - self.last
+        self.last = page
+        self.confirmed = stride != 0 and stride == self.stride
+        self.stride = stride
+        if not self.confirmed:
+            return ()
+        return range(page + stride, page + stride * (self.degree + 1), stride)
+
+@register_prefetcher
+class MarkovPrefetcher(Prefetcher):
+    # Correlation table: each page remembers the last `degree` distinct pages
+    # referenced right after it, most recent first, and those are fetched when
+    # it recurs. The table keeps the `table_size` most recently updated pages.
+    name = 'MARKOV'
+
+    def __init__(self, degree, table_size):
+        super().__init__(degree, table_size)
+        self.table_size = table_size
+        self.table = OrderedDict()
+        self.last = None
+
+    def observe(self, page, fault, useful):
+        last = self.last
+        self.last = page
+        if last is not None and last != page:
+            successors = self.table.pop(last, None)
+            if successors is None:
+                successors = []
+                if len(self.table) >= self.table_size:
+                    self.table.popitem(last=False)
+            elif page in successors:
+                successors.remove(page)
+            successors.insert(0, page)
+            del successors[self.degree:]
+            self.table[last] = successors
+        return self.table.get(page, ())
+
+class Prefetching:
+    # Outcome tracking for one run. A prefetched page is useful if it is
+    # referenced before being evicted; a page that a prefetch evicted and
+    # that later faults on demand counts as a useful page evicted.
+    def __init__(self, prefetcher):
+        self.prefetcher = prefetcher
+        self.unused = set()
+        self.displaced = set()
+        self.issued = 0
+        self.useful = 0
+        self.unused_evicted = 0
+        self.useful_evicted = 0
+
+    def reference(self, page, fault):
+        # Returns whether the reference used a prefetched page
+        useful = page in self.unused
+        if useful:
+            self.unused.discard(page)
+            self.useful += 1
+        elif fault and page in self.displaced:
+            self.useful_evicted += 1
+        self.displaced.discard(page)
+        return useful
+
+    def evicted(self, page, by_prefetch):
+        if page in self.unused:
+            self.unused.discard(page)
+            self.unused_evicted += 1
+        elif by_prefetch:
+            self.displaced.add(page)
+
+    def summary(self, faults):
+        return {
+            'prefetcher': self.prefetcher.name,
+            'issued': self.issued,
+            'useful': self.useful,
+            'accuracy': self.useful / self.issued if self.issued > 0 else 0,
+            # Share of would-be demand faults that prefetching removed
+            'coverage': self.useful / (self.useful + faults) if self.useful + faults > 0 else 0,
+            'unused_evicted': self.unused_evicted,
+            'useful_evicted': self.useful_evicted
+        }
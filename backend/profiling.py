@@ -0,0 +1,62 @@
+import cProfile
+import os
+import time
+import uuid
+
+# Clients opt in per request with e.g. `X-Profile: timing, cprofile`.
+# cProfile dumps are written only when the server sets SIMULATION_PROFILE_DIR.
+PROFILE_HEADER = "x-profile"
+PROFILE_DIR = os.environ.get("SIMULATION_PROFILE_DIR")
+
+def requested_modes(headers):
+    value = headers.get(PROFILE_HEADER, "")
+    return {mode.strip().lower() for mode in value.split(",") if mode.strip()}
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = {}
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def server_timing(self):
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases.items())
+
+class _Phase:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.started)
+        return False
+
+class RequestProfiler:
+    def __init__(self, label):
+        self.label = label
+        self.profile = cProfile.Profile() if PROFILE_DIR else None
+
+    def __enter__(self):
+        if self.profile is not None:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile is not None:
+            self.profile.disable()
+        return False
+
+    def dump(self):
+        if self.profile is None:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        filename = f"{self.label}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.prof"
+        self.profile.dump_stats(os.path.join(PROFILE_DIR, filename))
+        return filename
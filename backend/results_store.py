@@ -0,0 +1,157 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from contextlib import closing
+
+import numpy as np
+import orjson
+
+# Experiment results persisted in SQLite, so an old comparison is read back
+# rather than re-run. Each algorithm run is one row: the headline numbers as
+# indexed columns, the rest of the result as JSON, and optionally the step
+# history, zlib-compressed. Traces are identified by the trace store's ID
+# (SHA-256 of little-endian int64 pages), so rows line up with PUT /traces.
+# Every call opens its own connection; in WAL mode worker processes keep
+# reading while one writes.
+PATH = os.environ.get("RESULTS_DB", os.path.join(tempfile.gettempdir(), "page-replacement-results.sqlite3"))
+MAX_ROWS_PER_PAGE = 1000
+HISTORY_COMPRESSION_LEVEL = 6
+# Columns results can be filtered and grouped by
+GROUP_COLUMNS = ('trace_hash', 'algorithm', 'frames', 'paging_type', 'approximate')
+SUMMARY_COLUMNS = ('id', 'created_at', 'trace_hash', 'trace_length', 'algorithm', 'frames', 'paging_type', 'approximate', 'total_hits', 'total_page_faults', 'hit_ratio', 'fault_ratio')
+# Left out of the JSON summary: history is stored compressed, if at all
+BULKY_KEYS = ('history', 'page_table')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    trace_hash TEXT NOT NULL,
+    trace_length INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    frames INTEGER NOT NULL,
+    paging_type TEXT NOT NULL,
+    approximate INTEGER NOT NULL,
+    total_hits INTEGER NOT NULL,
+    total_page_faults INTEGER NOT NULL,
+    hit_ratio REAL NOT NULL,
+    fault_ratio REAL NOT NULL,
+    options TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    history BLOB
+);
+CREATE INDEX IF NOT EXISTS results_trace ON results (trace_hash, algorithm, frames);
+CREATE INDEX IF NOT EXISTS results_algorithm ON results (algorithm, frames);
+"""
+
+def trace_hash(pages):
+    try:
+        data = np.asarray(pages, dtype='<i8').tobytes()
+    except OverflowError:
+        raise ValueError("Results can only be saved for traces of 64-bit pages.")
+    return hashlib.sha256(data).hexdigest()
+
+def hashing(chunks, hasher):
+    # Passes chunks through, feeding them to `hasher` on the way
+    for chunk in chunks:
+        hasher.update(chunk.astype('<i8', copy=False).tobytes())
+        yield chunk
+
+class ResultsStore:
+    def __init__(self, path=PATH):
+        self.path = path
+        with closing(self.connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def save(self, trace_id, trace_length, frames, options, results, history=False):
+        # Returns the new rows' IDs in the order of `results`
+        now = time.time()
+        rows = []
+        for result in results:
+            summary = {key: value for key, value in result.items() if key not in BULKY_KEYS}
+            blob = None
+            if history and result.get('history') is not None:
+                blob = zlib.compress(orjson.dumps(result['history']), HISTORY_COMPRESSION_LEVEL)
+            rows.append((now, trace_id, trace_length, result['algorithm'], frames, result.get('paging_type', 'SINGLE'), int(bool(result.get('approximate'))),
+                         result['total_hits'], result['total_page_faults'], result['hit_ratio'], result['fault_ratio'],
+                         orjson.dumps(options).decode(), orjson.dumps(summary).decode(), blob))
+        ids = []
+        with closing(self.connect()) as db, db:
+            for row in rows:
+                cursor = db.execute("INSERT INTO results (created_at, trace_hash, trace_length, algorithm, frames, paging_type, approximate, total_hits, total_page_faults, hit_ratio, fault_ratio, options, summary, history) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def row(self, row, summary=False):
+        result = {column: row[column] for column in SUMMARY_COLUMNS}
+        result['approximate'] = bool(result['approximate'])
+        result['options'] = orjson.loads(row['options'])
+        if summary:
+            result['summary'] = orjson.loads(row['summary'])
+        return result
+
+    def get(self, result_id, history=False):
+        with closing(self.connect()) as db:
+            row = db.execute("SELECT * FROM results WHERE id = ?", (result_id,)).fetchone()
+        if row is None:
+            return None
+        result = self.row(row, summary=True)
+        result['has_history'] = row['history'] is not None
+        if history and row['history'] is not None:
+            result['history'] = orjson.loads(zlib.decompress(row['history']))
+        return result
+
+    def where(self, filters):
+        # filters: column -> value, plus min_frames, max_frames and since
+        clauses = []
+        params = []
+        for column in GROUP_COLUMNS:
+            value = filters.get(column)
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(int(value) if column == 'approximate' else value)
+        for key, clause in (('min_frames', "frames >= ?"), ('max_frames', "frames <= ?"), ('since', "created_at >= ?")):
+            if filters.get(key) is not None:
+                clauses.append(clause)
+                params.append(filters[key])
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, filters, limit=100, offset=0):
+        if not 1 <= limit <= MAX_ROWS_PER_PAGE:
+            raise ValueError(f"limit must be between 1 and {MAX_ROWS_PER_PAGE}.")
+        where, params = self.where(filters)
+        with closing(self.connect()) as db:
+            total = db.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+            rows = db.execute(f"SELECT * FROM results{where} ORDER BY id DESC LIMIT ? OFFSET ?", params + [limit, max(offset, 0)]).fetchall()
+        return {'total': total, 'results': [self.row(row) for row in rows]}
+
+    def aggregate(self, filters, group_by):
+        for column in group_by:
+            if column not in GROUP_COLUMNS:
+                raise ValueError(f"Invalid group_by column. Choose from {', '.join(GROUP_COLUMNS)}.")
+        where, params = self.where(filters)
+        # Column names are checked against GROUP_COLUMNS above
+        columns = ", ".join(group_by)
+        select = (columns + ", " if columns else "") + (
+            "COUNT(*) AS runs, AVG(fault_ratio) AS mean_fault_ratio, MIN(fault_ratio) AS min_fault_ratio, "
+            "MAX(fault_ratio) AS max_fault_ratio, AVG(hit_ratio) AS mean_hit_ratio, AVG(total_page_faults) AS mean_page_faults")
+        grouping = f" GROUP BY {columns} ORDER BY {columns}" if columns else ""
+        with closing(self.connect()) as db:
+            rows = db.execute(f"SELECT {select} FROM results{where}{grouping}", params).fetchall()
+        groups = []
+        for row in rows:
+            group = dict(row)
+            if 'approximate' in group:
+                group['approximate'] = bool(group['approximate'])
+            if group['runs'] > 0:
+                groups.append(group)
+        return {'groups': groups}
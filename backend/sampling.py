@@ -0,0 +1,75 @@
+import numpy as np
+
+# Approximate runs by spatial sampling (SHARDS, Waldspurger et al., FAST '15),
+# used as a miniature simulation: a page is sampled when its hash falls below
+# rate * 2**HASH_BITS, so either every reference to it is kept or none is.
+# Simulating the sample with frames scaled by the rate gives a fault ratio
+# that estimates the full run's for any policy, at the rate's share of the
+# cost. benchmarks/bench_sampling.py measures the error against exact runs;
+# it is within a few points for LRU, FIFO and OPTIMAL, but LFU, MRU and MFU
+# don't shrink with the cache the way a sample assumes and can be far off.
+HASH_BITS = 24
+# Below this many scaled frames a sample is too coarse to estimate anything:
+# at 100 frames and a 1% rate, a 1-frame sample was off by 15 to 33 points
+MIN_SCALED_FRAMES = 8
+# Fibonacci hashing spreads consecutive page numbers evenly
+MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+def validate_rate(rate, frames):
+    if not 0 < rate <= 1:
+        raise ValueError("sample_rate must be in (0, 1].")
+    if rate < 1 and scaled_frames(frames, rate) < MIN_SCALED_FRAMES:
+        if frames < MIN_SCALED_FRAMES:
+            raise ValueError(f"Sampling needs at least {MIN_SCALED_FRAMES} frames; leave sample_rate out for an exact run.")
+        raise ValueError(f"frames * sample_rate must be at least {MIN_SCALED_FRAMES}; use a sample_rate of at least {MIN_SCALED_FRAMES / frames:g}.")
+
+def scaled_frames(frames, rate):
+    return int(frames * rate + 0.5)
+
+def threshold(rate):
+    return int(rate * (1 << HASH_BITS))
+
+def sample(pages, rate):
+    try:
+        pages = np.asarray(pages, dtype=np.int64)
+    except OverflowError:
+        raise ValueError("sample_rate is limited to traces of 64-bit pages.")
+    with np.errstate(over='ignore'):
+        hashed = (pages.astype(np.uint64) * MULTIPLIER) >> np.uint64(64 - HASH_BITS)
+    return pages[hashed < threshold(rate)]
+
+def sample_chunks(chunks, rate):
+    # Returns the sampled trace and the full trace's length; chunks are
+    # dropped as they are sampled, so the full trace is never held
+    length = 0
+    kept = []
+    for chunk in chunks:
+        length += len(chunk)
+        kept.append(sample(chunk, rate))
+    sampled = np.concatenate(kept) if kept else np.zeros(0, dtype=np.int64)
+    return sampled.tolist(), length
+
+def estimate(simulator_factory, sampled, length, frames, algorithm, rate):
+    frames = scaled_frames(frames, rate)
+    result = simulator_factory().simulate(sampled, frames, algorithm, record_history=False)
+    # Faults are scaled by the expected sample size rather than the actual
+    # one (SHARDS-adj): a hot page landing in or out of the sample skews the
+    # sampled hit count far more than the fault count
+    expected = length * threshold(rate) / (1 << HASH_BITS)
+    faults = min(round(result['total_page_faults'] * length / expected), length) if expected > 0 else 0
+    fault_ratio = faults / length if length > 0 else 0
+    return {
+        'paging_type': 'SINGLE',
+        'algorithm': algorithm,
+        'approximate': True,
+        'total_page_faults': faults,
+        'total_hits': length - faults,
+        'hit_ratio': 1 - fault_ratio if length > 0 else 0,
+        'fault_ratio': fault_ratio,
+        'sampling': {
+            'rate': rate,
+            'scaled_frames': frames,
+            'sampled_references': len(sampled),
+            'total_references': length
+        }
+    }
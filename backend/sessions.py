@@ -0,0 +1,70 @@
+import os
+
+from incremental import Checkpoints
+
+# Interactive stepping over one algorithm's run. The simulator stays live
+# between calls and leaves a checkpoint at every CHECKPOINT_INTERVAL-th
+# reference it passes, so seeking anywhere replays at most one interval.
+CHECKPOINT_INTERVAL = 256
+MAX_BYTES = int(os.environ.get("SESSION_STORE_BYTES", 64 * 1024 * 1024))
+MAX_IDLE_SECONDS = float(os.environ.get("SESSION_IDLE_SECONDS", 900))
+
+class Session:
+    def __init__(self, simulator, reference_string, frame_count, algorithm, pff=None, interval=CHECKPOINT_INTERVAL):
+        self.simulator = simulator
+        self.reference_string = reference_string
+        self.algorithm = algorithm
+        self.pff = pff
+        self.checkpoints = Checkpoints(interval)
+        simulator.start(reference_string, frame_count, algorithm, pff)
+        self.checkpoints.append(simulator.checkpoint(0, 0))
+
+    @property
+    def position(self):
+        return self.simulator.stats['total']
+
+    @property
+    def total_steps(self):
+        return len(self.reference_string)
+
+    def advance(self, stop, record_history=True):
+        self.simulator.advance(self.reference_string, stop, self.pff, record_history, checkpoints=self.checkpoints)
+        # Steps go back to the caller rather than accumulating here
+        history = self.simulator.history
+        self.simulator.history = []
+        self.simulator.page_table_history = []
+        return history
+
+    def step(self, count):
+        return self.advance(min(self.position + count, self.total_steps))
+
+    def seek(self, position):
+        # Returns the entry for the step that lands on `position`, if any
+        position = min(max(position, 0), self.total_steps)
+        before = max(position - 1, 0)
+        # Checkpoints sit at every multiple of the interval reached so far
+        index = min(before // self.checkpoints.interval, len(self.checkpoints) - 1)
+        checkpoint = self.checkpoints[index]
+        if not checkpoint['position'] <= self.position <= before:
+            self.simulator.restore(checkpoint, self.reference_string, rebase=False)
+        self.advance(before, record_history=False)
+        return self.advance(position)
+
+    def back(self, count):
+        return self.seek(self.position - count)
+
+    def state(self):
+        stats = self.simulator.stats
+        return {
+            'algorithm': self.algorithm,
+            'position': stats['total'],
+            'total_steps': self.total_steps,
+            'total_hits': stats['hits'],
+            'total_page_faults': stats['faults'],
+            'memory': list(self.simulator.memory),
+            'finished': stats['total'] == self.total_steps
+        }
+
+    def nbytes(self):
+        frames = len(self.simulator.memory)
+        return 8 * self.total_steps + self.checkpoints.nbytes(frames) + self.simulator.policy.nbytes()
@@ -0,0 +1,118 @@
+from policies import Policy, get_policy
+
+# Exclusive tiered memory: every resident page lives in exactly one tier.
+# References are served from tier 0; a hit in a slower tier promotes the page
+# to tier 0, and each full tier demotes its policy's victim one tier down.
+# The last tier's victims go to swap, and misses load from swap into tier 0.
+MAX_TIERS = 8
+DEFAULT_SWAP_NS = 8000000.0
+
+def validate_tiers(tiers, swap_ns):
+    if not 1 <= len(tiers) <= MAX_TIERS:
+        raise ValueError(f"Provide between 1 and {MAX_TIERS} tiers.")
+    for tier in tiers:
+        cls = get_policy(tier.algorithm)
+        if cls is None:
+            raise ValueError(f"Invalid tier algorithm {tier.algorithm}.")
+        if cls.on_remove is Policy.on_remove:
+            raise ValueError(f"{tier.algorithm} can't be used in a tier: it doesn't support promotion.")
+        if tier.frames < 1:
+            raise ValueError("Each tier needs at least 1 frame.")
+        if tier.latency_ns < 0:
+            raise ValueError("Latencies must be non-negative.")
+    if swap_ns < 0:
+        raise ValueError("Latencies must be non-negative.")
+
+def simulate_tiers(reference_string, tiers, swap_ns=DEFAULT_SWAP_NS):
+    count = len(tiers)
+    policies = [get_policy(tier.algorithm)(tier.frames, reference_string) for tier in tiers]
+    capacity = [tier.frames for tier in tiers]
+    sizes = [0] * count
+    hits = [0] * count
+    promotions = [0] * count
+    demotions = [0] * count
+    swap_outs = 0
+    misses = 0
+    # page -> tier index; one lookup per reference whatever the depth
+    location = {}
+    on_hit = policies[0].on_hit
+    on_fault = policies[0].on_fault
+    victim = policies[0].victim
+    top = capacity[0]
+    # Bound once so the cascade does no attribute lookups
+    victims = [policy.victim for policy in policies]
+    inserts = [policy.on_insert for policy in policies]
+    removes = [policy.on_remove for policy in policies]
+
+    for step, page in enumerate(reference_string, 1):
+        tier = location.get(page)
+        if tier == 0:
+            hits[0] += 1
+            on_hit(page, step)
+            continue
+        if tier is None:
+            misses += 1
+        else:
+            hits[tier] += 1
+            promotions[tier] += 1
+            removes[tier](page, step)
+            sizes[tier] -= 1
+
+        if sizes[0] < top:
+            sizes[0] += 1
+            on_fault(page, step)
+            location[page] = 0
+            continue
+        demoted = victim(step)
+        on_fault(page, step)
+        location[page] = 0
+        # Cascade down until a tier has room; a promotion left a hole at
+        # `tier`, so the cascade stops there at the latest
+        level = 1
+        while True:
+            if level == count:
+                del location[demoted]
+                swap_outs += 1
+                break
+            next_demoted = None
+            if sizes[level] < capacity[level]:
+                sizes[level] += 1
+            else:
+                next_demoted = victims[level](step)
+            inserts[level](demoted, step)
+            location[demoted] = level
+            demotions[level] += 1
+            if next_demoted is None:
+                break
+            demoted = next_demoted
+            level += 1
+
+    total = len(reference_string)
+    served = sum(hits)
+    # Pages are accessed in place at their tier's latency, then promoted
+    simulated_time = swap_ns * misses + sum(tier.latency_ns * hit for tier, hit in zip(tiers, hits))
+    return {
+        'paging_type': 'TIERED',
+        'total_hits': served,
+        'total_page_faults': misses,
+        'hit_ratio': served / total if total > 0 else 0,
+        'fault_ratio': misses / total if total > 0 else 0,
+        'tiers': [{
+            'frames': tier.frames,
+            'algorithm': tier.algorithm.upper(),
+            'latency_ns': tier.latency_ns,
+            'hits': hits[i],
+            'hit_ratio': hits[i] / total if total > 0 else 0,
+            'promotions': promotions[i],
+            'demotions': demotions[i],
+            'resident': sizes[i]
+        } for i, tier in enumerate(tiers)],
+        'migrations': {
+            'promotions': sum(promotions),
+            'demotions': sum(demotions),
+            'swap_ins': misses,
+            'swap_outs': swap_outs
+        },
+        'simulated_time_ns': simulated_time,
+        'effective_access_time_ns': simulated_time / total if total > 0 else 0
+    }
@@ -0,0 +1,198 @@
+import hashlib
+import os
+import re
+import tempfile
+import zlib
+
+import numpy as np
+import orjson
+
+# Content-addressed store for uploaded traces on local disk. A trace is kept
+# as little-endian int64 pages and its ID is the SHA-256 of those bytes, so
+# uploading the same trace again stores nothing new (and clients can hash
+# locally to skip the upload). Each trace has a compressed copy, ID.zz, and
+# once used a raw copy, ID.i8, that is memory-mapped: worker processes
+# mapping the same file share its pages through the OS page cache. Files only
+# appear by renaming a finished temp file, so no worker sees a partial trace.
+# Past MAX_BYTES the least recently used traces are deleted; use is recorded
+# in file mtimes so every worker sees it.
+DIRECTORY = os.environ.get("TRACE_STORE_DIR", os.path.join(tempfile.gettempdir(), "page-replacement-traces"))
+MAX_BYTES = int(os.environ.get("TRACE_STORE_BYTES", 1024 * 1024 * 1024))
+COMPRESSION_LEVEL = 6
+CHUNK_SIZE = 1 << 20
+TRACE_ID = re.compile(r"[0-9a-f]{64}")
+# Compressed files start with the trace's length in pages
+HEADER = 8
+
+def parse_upload(body, content_type):
+    # Bodies in the formats /generate produces, or a JSON array
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type == "application/octet-stream":
+        if len(body) % 8:
+            raise ValueError("Binary traces must be little-endian int64 pages.")
+        return np.frombuffer(body, dtype='<i8')
+    if content_type == "application/json":
+        try:
+            pages = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            raise ValueError("JSON traces must be an array of pages.")
+        if not isinstance(pages, list) or not all(type(page) is int for page in pages):
+            raise ValueError("JSON traces must be an array of pages.")
+    else:
+        try:
+            pages = [int(page) for page in body.replace(b",", b" ").split()]
+        except ValueError:
+            raise ValueError("Text traces must be pages separated by commas or whitespace.")
+    try:
+        return np.array(pages, dtype='<i8')
+    except OverflowError:
+        raise ValueError("Stored traces are limited to 64-bit pages.")
+
+def chunks(pages, size=CHUNK_SIZE):
+    for start in range(0, len(pages), size):
+        yield pages[start:start + size]
+
+class TraceStore:
+    def __init__(self, directory=DIRECTORY, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, trace_id, suffix):
+        if not TRACE_ID.fullmatch(trace_id):
+            raise KeyError(trace_id)
+        return os.path.join(self.directory, trace_id + suffix)
+
+    def write(self, path, parts):
+        # Writes to a temp file in the same directory, then renames it into place
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for part in parts:
+                    f.write(part)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def put(self, pages):
+        # Returns the trace's ID and whether it was new
+        data = pages.astype('<i8', copy=False).tobytes()
+        if len(data) > self.max_bytes:
+            raise ValueError(f"Trace is larger than the store ({self.max_bytes} bytes).")
+        trace_id = hashlib.sha256(data).hexdigest()
+        path = self.path(trace_id, ".zz")
+        if self.touch(trace_id):
+            return trace_id, False
+
+        def compressed():
+            yield len(pages).to_bytes(HEADER, "little")
+            compressor = zlib.compressobj(COMPRESSION_LEVEL)
+            view = memoryview(data)
+            for start in range(0, len(view), 8 * CHUNK_SIZE):
+                yield compressor.compress(view[start:start + 8 * CHUNK_SIZE])
+            yield compressor.flush()
+        self.write(path, compressed())
+        self.evict(keep=trace_id)
+        return trace_id, True
+
+    def touch(self, trace_id):
+        # Marks the trace used; returns whether it exists
+        try:
+            os.utime(self.path(trace_id, ".zz"))
+            return True
+        except (FileNotFoundError, KeyError):
+            return False
+
+    def info(self, trace_id):
+        try:
+            path = self.path(trace_id, ".zz")
+            with open(path, "rb") as f:
+                length = int.from_bytes(f.read(HEADER), "little")
+            compressed = os.path.getsize(path)
+        except (FileNotFoundError, KeyError):
+            return None
+        return {
+            'trace_id': trace_id,
+            'length': length,
+            'compressed_bytes': compressed,
+            'compression_ratio': 8 * length / compressed if compressed > 0 else 0
+        }
+
+    def decompressed(self, path):
+        decompressor = zlib.decompressobj()
+        with open(path, "rb") as f:
+            f.read(HEADER)
+            while True:
+                block = f.read(8 * CHUNK_SIZE)
+                if not block:
+                    break
+                yield decompressor.decompress(block)
+        yield decompressor.flush()
+
+    def load(self, trace_id):
+        # Returns the pages as a read-only int64 array backed by the raw
+        # copy, or None if the trace isn't stored
+        if not self.touch(trace_id):
+            return None
+        raw = self.path(trace_id, ".i8")
+        if not os.path.exists(raw):
+            try:
+                self.write(raw, self.decompressed(self.path(trace_id, ".zz")))
+            except FileNotFoundError:
+                # Evicted by another worker since the touch
+                return None
+            self.evict(keep=trace_id)
+        try:
+            if os.path.getsize(raw) == 0:
+                return np.zeros(0, dtype='<i8')
+            return np.memmap(raw, dtype='<i8', mode='r')
+        except FileNotFoundError:
+            # Raw copy evicted in between; read the compressed one instead
+            try:
+                return np.frombuffer(b"".join(self.decompressed(self.path(trace_id, ".zz"))), dtype='<i8')
+            except FileNotFoundError:
+                return None
+
+    def delete(self, trace_id):
+        removed = False
+        for suffix in (".i8", ".zz"):
+            try:
+                os.unlink(self.path(trace_id, suffix))
+                removed = True
+            except (FileNotFoundError, KeyError):
+                pass
+        return removed
+
+    def usage(self):
+        # {trace_id: [bytes, last used]} over both copies
+        traces = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                trace_id, suffix = os.path.splitext(entry.name)
+                if suffix not in (".zz", ".i8"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                usage = traces.setdefault(trace_id, [0, 0.0])
+                usage[0] += stat.st_size
+                if suffix == ".zz":
+                    usage[1] = stat.st_mtime
+        return traces
+
+    def evict(self, keep=None):
+        traces = self.usage()
+        total = sum(size for size, _ in traces.values())
+        for trace_id, (size, _) in sorted(traces.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if trace_id == keep:
+                continue
+            try:
+                self.delete(trace_id)
+            except OSError:
+                # Still mapped on platforms that refuse to delete open files
+                continue
+            total -= size
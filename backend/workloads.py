@@ -0,0 +1,158 @@
+import numpy as np
+
+# Chunks are generated with a fixed size so that a seed always reproduces the
+# same trace, no matter how the consumer reads the stream.
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+class Workload:
+    name = None
+
+    def __init__(self, pages, rng):
+        if pages < 1:
+            raise ValueError("pages must be at least 1")
+        self.pages = pages
+
+    def generate(self, rng, count):
+        raise NotImplementedError
+
+class UniformWorkload(Workload):
+    name = 'UNIFORM'
+
+    def generate(self, rng, count):
+        return rng.integers(0, self.pages, size=count, dtype=np.int64)
+
+class ZipfWorkload(Workload):
+    # Bounded Zipf over `pages` ranks, sampled by inverting the CDF. Ranks are
+    # mapped to a random permutation of page ids unless shuffle is 0.
+    name = 'ZIPF'
+
+    def __init__(self, pages, rng, alpha=1.0, shuffle=1):
+        super().__init__(pages, rng)
+        weights = np.arange(1, pages + 1, dtype=np.float64) ** -alpha
+        self.cdf = np.cumsum(weights)
+        self.cdf /= self.cdf[-1]
+        self.page_ids = rng.permutation(pages).astype(np.int64) if shuffle else None
+
+    def generate(self, rng, count):
+        ranks = np.searchsorted(self.cdf, rng.random(count), side='right')
+        np.minimum(ranks, self.pages - 1, out=ranks)
+        if self.page_ids is None:
+            return ranks.astype(np.int64)
+        return self.page_ids[ranks]
+
+class WorkingSetWorkload(Workload):
+    # Phases of `phase_length` references, each drawn uniformly from a fresh
+    # working set of `working_set` distinct pages.
+    name = 'WORKING_SET'
+
+    def __init__(self, pages, rng, working_set=16, phase_length=10000):
+        super().__init__(pages, rng)
+        self.working_set = min(int(working_set), pages)
+        self.phase_length = int(phase_length)
+        if self.working_set < 1 or self.phase_length < 1:
+            raise ValueError("working_set and phase_length must be at least 1")
+        self.current = None
+        self.remaining = 0
+
+    def generate(self, rng, count):
+        out = np.empty(count, dtype=np.int64)
+        filled = 0
+        while filled < count:
+            if self.remaining == 0:
+                self.current = rng.choice(self.pages, size=self.working_set, replace=False).astype(np.int64)
+                self.remaining = self.phase_length
+            take = min(self.remaining, count - filled)
+            out[filled:filled + take] = self.current[rng.integers(0, self.working_set, size=take)]
+            filled += take
+            self.remaining -= take
+        return out
+
+class LoopWorkload(Workload):
+    # Repeated scans over `loop_length` consecutive pages starting at `start`
+    name = 'LOOP'
+
+    def __init__(self, pages, rng, loop_length=None, start=0):
+        super().__init__(pages, rng)
+        self.loop_length = int(loop_length or pages)
+        self.start = int(start)
+        if self.loop_length < 1:
+            raise ValueError("loop_length must be at least 1")
+        self.offset = 0
+
+    def generate(self, rng, count):
+        out = (np.arange(self.offset, self.offset + count, dtype=np.int64) % self.loop_length + self.start) % self.pages
+        self.offset = (self.offset + count) % self.loop_length
+        return out
+
+class SequentialWorkload(Workload):
+    # Strided sweep through the page space, wrapping at `pages`
+    name = 'SEQUENTIAL'
+
+    def __init__(self, pages, rng, stride=1, start=0):
+        super().__init__(pages, rng)
+        self.stride = int(stride)
+        self.position = int(start) % pages
+
+    def generate(self, rng, count):
+        out = (self.position + np.arange(count, dtype=np.int64) * self.stride) % self.pages
+        self.position = int((self.position + count * self.stride) % self.pages)
+        return out
+
+class MarkovWorkload(Workload):
+    # With probability `locality` the next page is a short step (within
+    # +/- window) from the current one, otherwise a uniform jump. The walk is
+    # vectorized by cumulating steps inside each run between jumps.
+    name = 'MARKOV'
+
+    def __init__(self, pages, rng, locality=0.9, window=4):
+        super().__init__(pages, rng)
+        self.locality = float(locality)
+        self.window = int(window)
+        self.current = int(rng.integers(0, pages))
+
+    def generate(self, rng, count):
+        jumps = rng.random(count) >= self.locality
+        steps = rng.integers(-self.window, self.window + 1, size=count, dtype=np.int64)
+        targets = rng.integers(0, self.pages, size=count, dtype=np.int64)
+
+        # A jump resets the walk to its target; the first run continues from
+        # the page generated last.
+        steps[jumps] = 0
+        base = np.where(jumps, targets, 0)
+        run_start = np.maximum.accumulate(np.where(jumps, np.arange(count), -1))
+        offsets = np.cumsum(steps)
+        start_offsets = np.where(run_start >= 0, offsets[np.maximum(run_start, 0)], 0)
+        origin = np.where(run_start >= 0, base[np.maximum(run_start, 0)], self.current)
+        out = (origin + offsets - start_offsets) % self.pages
+        self.current = int(out[-1]) if count else self.current
+        return out
+
+WORKLOADS = {cls.name: cls for cls in [UniformWorkload, ZipfWorkload, WorkingSetWorkload, LoopWorkload, SequentialWorkload, MarkovWorkload]}
+
+def stream(model, length, pages, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, **params):
+    cls = WORKLOADS.get(model.upper())
+    if cls is None:
+        raise ValueError(f"Unknown workload model. Choose from {', '.join(WORKLOADS)}.")
+    if length < 0:
+        raise ValueError("length must not be negative")
+    rng = np.random.default_rng(seed)
+    try:
+        workload = cls(pages, rng, **params)
+    except TypeError as e:
+        raise ValueError(f"Invalid parameters for {cls.name}: {e}")
+    remaining = length
+    while remaining > 0:
+        count = min(chunk_size, remaining)
+        yield workload.generate(rng, count)
+        remaining -= count
+
+def generate(model, length, pages, seed=None, **params):
+    # stream() only validates once iterated, so check before allocating
+    if length < 0:
+        raise ValueError("length must not be negative")
+    out = np.empty(length, dtype=np.int64)
+    filled = 0
+    for chunk in stream(model, length, pages, seed, **params):
+        out[filled:filled + len(chunk)] = chunk
+        filled += len(chunk)
+    return out
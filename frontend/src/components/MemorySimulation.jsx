@@ -1,5 +1,14 @@
-import React, { useState } from "react";
+import React, { useMemo, useState } from "react";
 import "../styles/MemorySimulation.css";
+import { COLUMNAR_MEDIA_TYPE, decodeColumnar, frameCount } from "../utils/columnar";
+import { createStepSource } from "../utils/stepSource";
+import { canSimulateLocally, simulateLocally } from "../simulator/client";
+import { PageTableView, StepDetailsView } from "./StepViews";
+
+// Short traces are simulated in the browser; longer ones come back as
+// summaries and their steps are fetched on demand
+const LOCAL_THRESHOLD = 2000;
+const LAZY_THRESHOLD = 5000;
 
 const PageReplacementSimulation = () => {
 
@@ -18,6 +27,11 @@ const PageReplacementSimulation = () => {
   const [activeResultIndex, setActiveResultIndex] = useState(0);
   const [showGraphicalComparison, setShowGraphicalComparison] = useState(false);
 
+  const stepSource = useMemo(
+    () => (results[activeResultIndex] ? createStepSource(backendUrl, results[activeResultIndex]) : null),
+    [backendUrl, results, activeResultIndex]
+  );
+
   const replacementAlgos = [
     { value: "fifo", label: "FIFO" },
     { value: "lru", label: "LRU" },
@@ -58,13 +72,21 @@ const PageReplacementSimulation = () => {
       const requestData = {
         requests: requestsArray,
         frames: parseInt(formData.frames),
-        algorithm: formData.algorithm
+        algorithm: formData.algorithm,
+        lazy: requestsArray.length > LAZY_THRESHOLD
       };
 
+      // Same results as /simulate without the round-trip, off the UI thread
+      if (requestsArray.length <= LOCAL_THRESHOLD && canSimulateLocally()) {
+        setResults(await simulateLocally(requestData));
+        return;
+      }
+
       const response = await fetch(`${backendUrl}/simulate`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Accept': `${COLUMNAR_MEDIA_TYPE}, application/json;q=0.9`,
         },
         body: JSON.stringify(requestData)
       });
@@ -74,7 +96,11 @@ const PageReplacementSimulation = () => {
         throw new Error(errorData.error || 'Network response was not ok');
       }
       
-      const data = await response.json();
+      // The backend falls back to JSON when a run can't be sent as columns
+      const contentType = response.headers.get('Content-Type') || '';
+      const data = contentType.startsWith(COLUMNAR_MEDIA_TYPE)
+        ? decodeColumnar(await response.arrayBuffer())
+        : await response.json();
       setResults(data);
     } catch (error) {
       console.error('Error:', error);
@@ -120,29 +146,8 @@ const PageReplacementSimulation = () => {
       <div className="result-view">
         <h4>Page Table Evolution:</h4>
         <div className="page-table-container">
-          {result.page_table && Array.isArray(result.page_table) ? (
-            <table className="page-table">
-              <thead>
-                <tr>
-                  <th>Steps</th>
-                  {result.page_table.map((_, step) => (
-                    <th key={step}>{step + 1}</th>
-                  ))}
-                </tr>
-              </thead>
-              <tbody>
-                {Array.from({ length: formData.frames }).map((_, frameIdx) => (
-                  <tr key={frameIdx}>
-                    <td className="frame-label">Frame {frameIdx}</td>
-                    {result.page_table.map((frameState, step) => (
-                      <td key={`${frameIdx}-${step}`}>
-                        {frameState[frameIdx] !== null ? frameState[frameIdx] : "-"}
-                      </td>
-                    ))}
-                  </tr>
-                ))}
-              </tbody>
-            </table>
+          {stepSource.count > 0 ? (
+            <PageTableView source={stepSource} frames={frameCount(result)} />
           ) : (
             <div className="no-page-table">No page table data available</div>
           )}
@@ -151,42 +156,13 @@ const PageReplacementSimulation = () => {
     );
   };
 
-  const renderDetails = (result) => {
+  const renderDetails = () => {
     return (
       <div className="result-view">
         <h4>Detailed Steps:</h4>
         <div className="details-container">
-          {result.history && Array.isArray(result.history) ? (
-            <table className="details-table">
-              <thead>
-                <tr>
-                  <th>Step</th>
-                  <th>Page</th>
-                  <th>Event</th>
-                  <th>Action</th>
-                  <th>Memory State</th>
-                </tr>
-              </thead>
-              <tbody>
-                {result.history.map((entry, idx) => (
-                  <tr key={idx} className={entry.event}>
-                    <td>{entry.step}</td>
-                    <td>{entry.page}</td>
-                    <td className={`event-${entry.event}`}>
-                      {entry.event.toUpperCase()}
-                    </td>
-                    <td>{entry.action || "-"}</td>
-                    <td>
-                      {entry.memory.map((page, i) => (
-                        <span key={i} className="memory-page">
-                          {page !== null ? page : "-"}
-                        </span>
-                      ))}
-                    </td>
-                  </tr>
-                ))}
-              </tbody>
-            </table>
+          {stepSource.count > 0 ? (
+            <StepDetailsView source={stepSource} />
           ) : (
             <div className="no-details">No detailed history available</div>
           )}
@@ -439,7 +415,7 @@ const renderGraphicalComparison = () => {
             <div className="result-view-container">
               {viewMode === 'final' && renderFinalMemoryState(results[activeResultIndex])}
               {viewMode === 'pageTable' && renderPageTable(results[activeResultIndex])}
-              {viewMode === 'details' && renderDetails(results[activeResultIndex])}
+              {viewMode === 'details' && renderDetails()}
             </div>
           </>
         ) : (
@@ -0,0 +1,183 @@
+import React, { useCallback, useEffect, useLayoutEffect, useRef, useState } from "react";
+import { virtualWindow } from "../utils/virtualWindow";
+
+// Step views that keep only the visible window of steps in the DOM, so long
+// runs scroll as cheaply as short ones.
+const ROW_HEIGHT = 40;
+const STEP_WIDTH = 64;
+const FETCH_DELAY_MS = 60;
+
+const useVirtualWindow = (count, itemSize, axis) => {
+  const ref = useRef(null);
+  const [scroll, setScroll] = useState({ offset: 0, viewport: 0 });
+
+  const measure = useCallback(() => {
+    const element = ref.current;
+    if (!element) return;
+    setScroll(axis === 'x'
+      ? { offset: element.scrollLeft, viewport: element.clientWidth }
+      : { offset: element.scrollTop, viewport: element.clientHeight });
+  }, [axis]);
+
+  useLayoutEffect(() => {
+    measure();
+    window.addEventListener('resize', measure);
+    return () => window.removeEventListener('resize', measure);
+  }, [measure]);
+
+  const range = virtualWindow({ count, itemSize, viewportSize: scroll.viewport, scrollOffset: scroll.offset });
+  return { ref, onScroll: measure, ...range };
+};
+
+// Asks the source for [start, end) once scrolling settles and re-renders
+// when the steps arrive
+const useStepRange = (source, start, end) => {
+  const [, setVersion] = useState(0);
+
+  useEffect(() => {
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      source.load(start, end).then((loaded) => {
+        if (loaded && !cancelled) setVersion(version => version + 1);
+      });
+    }, FETCH_DELAY_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [source, start, end]);
+};
+
+const cell = (page) => (page !== null ? page : "-");
+
+export const PageTableView = ({ source, frames }) => {
+  const { ref, onScroll, start, end, offset, scrollSize } = useVirtualWindow(source.count, STEP_WIDTH, 'x');
+  useStepRange(source, start, end);
+
+  const steps = [];
+  for (let step = start; step < end; step++) {
+    steps.push(step);
+  }
+  const frameRows = Array.from({ length: frames }, (_, frameIdx) => frameIdx);
+
+  return (
+    <>
+      {source.error && <div className="error-message">Error: {source.error}</div>}
+      <div className="virtual-page-table">
+        <table className="virtual-table page-table-labels">
+          <tbody>
+            <tr style={{ height: ROW_HEIGHT }}>
+              <th>Steps</th>
+            </tr>
+            {frameRows.map((frameIdx) => (
+              <tr key={frameIdx} style={{ height: ROW_HEIGHT }}>
+                <td className="frame-label">Frame {frameIdx}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+        <div className="virtual-scroller horizontal" ref={ref} onScroll={onScroll}>
+          <div className="virtual-spacer" style={{ width: scrollSize, height: (frames + 1) * ROW_HEIGHT }}>
+            <table
+              className="virtual-table page-table"
+              style={{ width: steps.length * STEP_WIDTH, transform: `translateX(${offset}px)` }}
+            >
+              <colgroup>
+                {steps.map((step) => (
+                  <col key={step} style={{ width: STEP_WIDTH }} />
+                ))}
+              </colgroup>
+              <tbody>
+                <tr style={{ height: ROW_HEIGHT }}>
+                  {steps.map((step) => (
+                    <th key={step}>{step + 1}</th>
+                  ))}
+                </tr>
+                {frameRows.map((frameIdx) => (
+                  <tr key={frameIdx} style={{ height: ROW_HEIGHT }}>
+                    {steps.map((step) => {
+                      const entry = source.get(step);
+                      return (
+                        <td key={step}>
+                          {entry ? cell(entry.memory[frameIdx]) : "…"}
+                        </td>
+                      );
+                    })}
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        </div>
+      </div>
+    </>
+  );
+};
+
+const DETAIL_COLUMNS = (
+  <colgroup>
+    <col style={{ width: "12%" }} />
+    <col style={{ width: "10%" }} />
+    <col style={{ width: "12%" }} />
+    <col style={{ width: "36%" }} />
+    <col style={{ width: "30%" }} />
+  </colgroup>
+);
+
+export const StepDetailsView = ({ source }) => {
+  const { ref, onScroll, start, end, offset, scrollSize } = useVirtualWindow(source.count, ROW_HEIGHT, 'y');
+  useStepRange(source, start, end);
+
+  const rows = [];
+  for (let step = start; step < end; step++) {
+    const entry = source.get(step);
+    rows.push(entry ? (
+      <tr key={step} className={entry.event} style={{ height: ROW_HEIGHT }}>
+        <td>{entry.step}</td>
+        <td>{entry.page}</td>
+        <td className={`event-${entry.event}`}>
+          {entry.event.toUpperCase()}
+        </td>
+        <td>{entry.action || "-"}</td>
+        <td>
+          {entry.memory.map((page, i) => (
+            <span key={i} className="memory-page">
+              {cell(page)}
+            </span>
+          ))}
+        </td>
+      </tr>
+    ) : (
+      <tr key={step} style={{ height: ROW_HEIGHT }}>
+        <td>{step + 1}</td>
+        <td colSpan={4}>…</td>
+      </tr>
+    ));
+  }
+
+  return (
+    <>
+      {source.error && <div className="error-message">Error: {source.error}</div>}
+      <table className="virtual-table details-table">
+        {DETAIL_COLUMNS}
+        <thead>
+          <tr style={{ height: ROW_HEIGHT }}>
+            <th>Step</th>
+            <th>Page</th>
+            <th>Event</th>
+            <th>Action</th>
+            <th>Memory State</th>
+          </tr>
+        </thead>
+      </table>
+      <div className="virtual-scroller vertical" ref={ref} onScroll={onScroll}>
+        <div className="virtual-spacer" style={{ height: scrollSize }}>
+          <table className="virtual-table details-table" style={{ transform: `translateY(${offset}px)` }}>
+            {DETAIL_COLUMNS}
+            <tbody>{rows}</tbody>
+          </table>
+        </div>
+      </div>
+    </>
+  );
+};
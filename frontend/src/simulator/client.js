@@ -0,0 +1,38 @@
+// Promise wrapper around the simulator worker. The worker is started on first
+// use and shared; each request gets an id so replies can't be mixed up.
+let worker = null;
+let nextId = 0;
+const pending = new Map();
+
+const startWorker = () => {
+  worker = new Worker(new URL("./worker.js", import.meta.url), { type: "module" });
+  worker.onmessage = ({ data: { id, results, error } }) => {
+    const request = pending.get(id);
+    pending.delete(id);
+    if (error) {
+      request.reject(new Error(error));
+    } else {
+      request.resolve(results);
+    }
+  };
+  worker.onerror = (event) => {
+    // A crashed worker fails everything in flight and is restarted next time
+    for (const request of pending.values()) {
+      request.reject(new Error(event.message || "Simulation worker failed"));
+    }
+    pending.clear();
+    worker.terminate();
+    worker = null;
+  };
+};
+
+export const canSimulateLocally = () => typeof Worker !== "undefined";
+
+export const simulateLocally = (request) => {
+  if (!worker) startWorker();
+  const id = nextId++;
+  return new Promise((resolve, reject) => {
+    pending.set(id, { resolve, reject });
+    worker.postMessage({ id, request });
+  });
+};
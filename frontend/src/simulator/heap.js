@@ -0,0 +1,58 @@
+// Binary min-heap of arrays compared element by element, matching how
+// Python's heapq orders the tuples the backend policies push.
+const less = (a, b) => {
+  for (let i = 0; i < a.length; i++) {
+    if (a[i] !== b[i]) return a[i] < b[i];
+  }
+  return false;
+};
+
+export class Heap {
+  constructor(items = []) {
+    this.items = items;
+    for (let i = (items.length >> 1) - 1; i >= 0; i--) {
+      this.down(i);
+    }
+  }
+
+  get size() {
+    return this.items.length;
+  }
+
+  push(item) {
+    const items = this.items;
+    items.push(item);
+    let i = items.length - 1;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!less(items[i], items[parent])) break;
+      [items[i], items[parent]] = [items[parent], items[i]];
+      i = parent;
+    }
+  }
+
+  pop() {
+    const items = this.items;
+    const top = items[0];
+    const last = items.pop();
+    if (items.length > 0) {
+      items[0] = last;
+      this.down(0);
+    }
+    return top;
+  }
+
+  down(i) {
+    const items = this.items;
+    for (;;) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let smallest = i;
+      if (left < items.length && less(items[left], items[smallest])) smallest = left;
+      if (right < items.length && less(items[right], items[smallest])) smallest = right;
+      if (smallest === i) return;
+      [items[i], items[smallest]] = [items[smallest], items[i]];
+      i = smallest;
+    }
+  }
+}
@@ -0,0 +1,135 @@
+import { Heap } from "./heap";
+
+// Ports of backend/policies.py. Each policy must pick exactly the victim its
+// backend counterpart picks, tie-breaks included, so that client-side runs
+// match /simulate step for step. Maps keep insertion order, standing in for
+// Python's OrderedDict.
+export const DEFAULT_POLICIES = ["FIFO", "LRU", "OPTIMAL", "LFU", "MRU", "MFU"];
+
+const firstKey = (map) => map.keys().next().value;
+
+class FIFOPolicy {
+  constructor() {
+    this.queue = new Map();
+  }
+
+  onHit() {}
+
+  onFault(page, step) {
+    this.queue.set(page, step);
+  }
+
+  victim() {
+    const page = firstKey(this.queue);
+    this.queue.delete(page);
+    return page;
+  }
+}
+
+class LRUPolicy {
+  constructor() {
+    this.recency = new Map();
+  }
+
+  onHit(page, step) {
+    this.recency.delete(page);
+    this.recency.set(page, step);
+  }
+
+  onFault(page, step) {
+    this.recency.set(page, step);
+  }
+
+  victim() {
+    const page = firstKey(this.recency);
+    this.recency.delete(page);
+    return page;
+  }
+}
+
+class MRUPolicy extends LRUPolicy {
+  victim() {
+    // The most recent page is the last key in the map
+    const page = Array.from(this.recency.keys()).at(-1);
+    this.recency.delete(page);
+    return page;
+  }
+}
+
+// Counts are per load and survive eviction; ties go to the earliest loaded page
+class LFUPolicy {
+  constructor(sign = 1) {
+    this.sign = sign;
+    this.accessCounts = new Map();
+    this.heap = new Heap();
+  }
+
+  onHit() {}
+
+  onFault(page, step) {
+    const count = (this.accessCounts.get(page) || 0) + 1;
+    this.accessCounts.set(page, count);
+    this.heap.push([this.sign * count, step, page]);
+  }
+
+  victim() {
+    return this.heap.pop()[2];
+  }
+}
+
+// Farthest next use wins, earliest loaded among pages never used again
+class OptimalPolicy {
+  constructor(referenceString) {
+    this.never = referenceString.length;
+    this.nextUse = new Array(referenceString.length);
+    const seen = new Map();
+    for (let i = referenceString.length - 1; i >= 0; i--) {
+      const page = referenceString[i];
+      this.nextUse[i] = seen.has(page) ? seen.get(page) : this.never;
+      seen.set(page, i);
+    }
+    this.resident = new Map();
+    this.heap = new Heap();
+  }
+
+  onHit(page, step) {
+    const next = this.nextUse[step - 1];
+    const entry = this.resident.get(page);
+    entry.next = next;
+    this.heap.push([-next, entry.loadedAt, page]);
+    if (this.heap.size > 2 * this.resident.size + 64) {
+      this.heap = new Heap(Array.from(this.resident, ([resident, state]) => [-state.next, state.loadedAt, resident]));
+    }
+  }
+
+  onFault(page, step) {
+    const next = this.nextUse[step - 1];
+    this.resident.set(page, { next, loadedAt: step });
+    this.heap.push([-next, step, page]);
+  }
+
+  victim() {
+    for (;;) {
+      const [next, loadedAt, page] = this.heap.pop();
+      const entry = this.resident.get(page);
+      if (entry && entry.next === -next && entry.loadedAt === loadedAt) {
+        this.resident.delete(page);
+        return page;
+      }
+    }
+  }
+}
+
+const POLICIES = {
+  FIFO: () => new FIFOPolicy(),
+  LRU: () => new LRUPolicy(),
+  MRU: () => new MRUPolicy(),
+  LFU: () => new LFUPolicy(1),
+  MFU: () => new LFUPolicy(-1),
+  OPTIMAL: (referenceString) => new OptimalPolicy(referenceString)
+};
+
+export const createPolicy = (name, referenceString) => {
+  const factory = POLICIES[name.toUpperCase()];
+  return factory ? factory(referenceString) : null;
+};
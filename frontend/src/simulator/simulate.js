@@ -0,0 +1,67 @@
+import { DEFAULT_POLICIES, createPolicy } from "./policies";
+
+// Client-side port of PageReplacementSimulator.simulate() without PFF. The
+// result has the same keys, order and history entries as /simulate.
+export const simulate = (referenceString, frameCount, algorithm) => {
+  const policy = createPolicy(algorithm, referenceString);
+  const memory = new Array(frameCount).fill(null);
+  const pageTable = new Map();
+  const history = [];
+  const pageTableHistory = [];
+  let hits = 0;
+
+  referenceString.forEach((page, i) => {
+    const step = i + 1;
+    let event;
+    let action;
+    if (pageTable.has(page)) {
+      hits += 1;
+      policy.onHit(page, step);
+      event = "hit";
+      action = "";
+    } else {
+      let frameIndex;
+      if (pageTable.size < frameCount) {
+        frameIndex = memory.indexOf(null);
+        action = `Loaded to frame ${frameIndex}`;
+      } else {
+        const victimPage = policy.victim(step);
+        frameIndex = pageTable.get(victimPage);
+        pageTable.delete(victimPage);
+        action = `Replaced page ${victimPage} (frame ${frameIndex})`;
+      }
+      memory[frameIndex] = page;
+      pageTable.set(page, frameIndex);
+      policy.onFault(page, step);
+      event = "fault";
+    }
+    history.push({ page, memory: memory.slice(), event, action, step });
+    pageTableHistory.push(memory.slice());
+  });
+
+  const total = referenceString.length;
+  return {
+    paging_type: "SINGLE",
+    algorithm,
+    total_page_faults: total - hits,
+    total_hits: hits,
+    hit_ratio: total > 0 ? hits / total : 0,
+    fault_ratio: total > 0 ? (total - hits) / total : 0,
+    history,
+    page_table: pageTableHistory,
+    final_memory_state: memory.slice()
+  };
+};
+
+// Mirrors the algorithm and frame handling of the /simulate endpoint
+export const runSimulation = ({ requests, frames, algorithm }) => {
+  const name = algorithm.toUpperCase();
+  const algorithms = name === "ALL" ? DEFAULT_POLICIES : [name];
+  if (!algorithms.every((algo) => createPolicy(algo, []))) {
+    throw new Error(`Invalid algorithm. Choose from ${DEFAULT_POLICIES.join(", ")}, or ALL.`);
+  }
+  if (!(frames >= 1)) {
+    throw new Error("Number of frames must be at least 1.");
+  }
+  return algorithms.map((algo) => simulate(requests, frames, algo));
+};
@@ -0,0 +1,10 @@
+import { runSimulation } from "./simulate";
+
+// Runs small simulations off the UI thread; replies are matched by id
+self.onmessage = ({ data: { id, request } }) => {
+  try {
+    self.postMessage({ id, results: runSimulation(request) });
+  } catch (error) {
+    self.postMessage({ id, error: error.message });
+  }
+};
@@ -0,0 +1,95 @@
+// Decoder for the packed columnar /simulate format (see backend/columnar.py).
+// Columns are exposed as typed-array views over the response buffer.
+export const COLUMNAR_MEDIA_TYPE = "application/vnd.page-sim.columnar";
+
+const MAGIC = "PRSC";
+const EMPTY = -2147483648;
+
+const align4 = (offset) => (offset + 3) & ~3;
+
+export const decodeColumnar = (buffer) => {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC) {
+    throw new Error("Unrecognized simulation response format");
+  }
+  const resultCount = view.getUint16(6, true);
+  let offset = 8;
+
+  const int32Column = (length) => {
+    const column = new Int32Array(buffer, offset, length);
+    offset += length * 4;
+    return column;
+  };
+
+  const results = [];
+  for (let r = 0; r < resultCount; r++) {
+    const steps = view.getUint32(offset, true);
+    const frames = view.getUint32(offset + 4, true);
+    const hits = view.getUint32(offset + 8, true);
+    const faults = view.getUint32(offset + 12, true);
+    const nameLength = view.getUint32(offset + 16, true);
+    offset += 20;
+    const algorithm = new TextDecoder().decode(new Uint8Array(buffer, offset, nameLength));
+    offset = align4(offset + nameLength);
+
+    const pages = int32Column(steps);
+    const frame = int32Column(steps);
+    const victim = int32Column(steps);
+    const memory = int32Column(steps * frames);
+    const events = new Uint8Array(buffer, offset, (steps + 7) >> 3);
+    offset = align4(offset + events.length);
+
+    results.push({
+      columnar: true,
+      algorithm,
+      steps,
+      frames,
+      pages,
+      frame,
+      victim,
+      memory,
+      events,
+      total_hits: hits,
+      total_page_faults: faults,
+      hit_ratio: steps > 0 ? hits / steps : 0,
+      fault_ratio: steps > 0 ? faults / steps : 0,
+      final_memory_state: steps > 0 ? memoryRow(memory, frames, steps - 1) : new Array(frames).fill(null)
+    });
+  }
+  return results;
+};
+
+const memoryRow = (memory, frames, step) =>
+  Array.from(memory.subarray(step * frames, (step + 1) * frames), (page) => (page === EMPTY ? null : page));
+
+// Accessors that work for both JSON and columnar results, so views don't
+// need to know which format the backend sent.
+export const stepCount = (result) =>
+  result.columnar ? result.steps : (Array.isArray(result.history) ? result.history.length : 0);
+
+export const frameCount = (result) =>
+  result.columnar ? result.frames : (result.final_memory_state || []).length;
+
+export const memoryAt = (result, step) =>
+  result.columnar ? memoryRow(result.memory, result.frames, step) : result.page_table[step];
+
+export const historyAt = (result, step) => {
+  if (!result.columnar) {
+    return result.history[step];
+  }
+  const fault = (result.events[step >> 3] >> (step & 7)) & 1;
+  const frame = result.frame[step];
+  const victim = result.victim[step];
+  let action = "";
+  if (frame >= 0) {
+    action = victim === EMPTY ? `Loaded to frame ${frame}` : `Replaced page ${victim} (frame ${frame})`;
+  }
+  return {
+    page: result.pages[step],
+    memory: memoryAt(result, step),
+    event: fault ? "fault" : "hit",
+    action,
+    step: step + 1
+  };
+};
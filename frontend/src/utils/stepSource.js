@@ -0,0 +1,76 @@
+import { historyAt, stepCount } from "./columnar";
+
+// Uniform access to a result's steps. Eager results (JSON or columnar) hold
+// every step already; lazy results carry a simulation_id and their steps are
+// fetched from /simulations/{id}/steps in fixed chunks as they come into view.
+const CHUNK_SIZE = 256;
+const MAX_CHUNKS = 128;
+
+export const createStepSource = (backendUrl, result) => {
+  if (result.simulation_id === undefined) {
+    return {
+      count: stepCount(result),
+      get: (step) => historyAt(result, step),
+      load: () => Promise.resolve(false),
+      error: null
+    };
+  }
+
+  // Map iteration order doubles as recency for evicting old chunks
+  const chunks = new Map();
+  const pending = new Map();
+
+  const fetchChunk = (index) => {
+    if (!pending.has(index)) {
+      const from = index * CHUNK_SIZE;
+      const url = `${backendUrl}/simulations/${result.simulation_id}/steps?from=${from}&to=${from + CHUNK_SIZE}`;
+      const request = fetch(url)
+        .then(async (response) => {
+          const data = await response.json();
+          if (!response.ok || data.error) {
+            throw new Error(data.error || 'Failed to load simulation steps');
+          }
+          chunks.set(index, data.history);
+          if (chunks.size > MAX_CHUNKS) {
+            chunks.delete(chunks.keys().next().value);
+          }
+        })
+        .finally(() => pending.delete(index));
+      pending.set(index, request);
+    }
+    return pending.get(index);
+  };
+
+  const source = {
+    count: result.total_steps,
+    error: null,
+    get(step) {
+      const chunk = chunks.get(Math.floor(step / CHUNK_SIZE));
+      return chunk ? chunk[step % CHUNK_SIZE] : undefined;
+    },
+    // Resolves to true once any missing chunk in [start, end) has arrived
+    load(start, end) {
+      const requests = [];
+      for (let index = Math.floor(start / CHUNK_SIZE); index * CHUNK_SIZE < end; index++) {
+        const chunk = chunks.get(index);
+        if (chunk) {
+          chunks.delete(index);
+          chunks.set(index, chunk);
+        } else {
+          requests.push(fetchChunk(index));
+        }
+      }
+      if (requests.length === 0) {
+        return Promise.resolve(false);
+      }
+      return Promise.all(requests).then(
+        () => true,
+        (error) => {
+          source.error = error.message;
+          return true;
+        }
+      );
+    }
+  };
+  return source;
+};
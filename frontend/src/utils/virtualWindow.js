@@ -0,0 +1,24 @@
+// Windowing math for long step lists. Browsers cap element sizes (around
+// 17-33 million px), so a list is drawn in a scroll area of at most
+// MAX_SCROLL_SIZE and the scroll offset is scaled back to item positions.
+export const MAX_SCROLL_SIZE = 10000000;
+
+export const virtualWindow = ({ count, itemSize, viewportSize, scrollOffset, overscan = 4 }) => {
+  const contentSize = count * itemSize;
+  const scrollSize = Math.min(contentSize, MAX_SCROLL_SIZE);
+  const maxScroll = Math.max(scrollSize - viewportSize, 0);
+  const ratio = maxScroll > 0 ? Math.max(contentSize - viewportSize, 0) / maxScroll : 1;
+  const clamped = Math.min(Math.max(scrollOffset, 0), maxScroll);
+  // Where the viewport starts in the unscaled list
+  const position = clamped * ratio;
+
+  const start = Math.max(0, Math.floor(position / itemSize) - overscan);
+  const end = Math.min(count, Math.ceil((position + viewportSize) / itemSize) + overscan);
+  return {
+    start,
+    end,
+    // Offset of item `start` inside the scroll area
+    offset: clamped + start * itemSize - position,
+    scrollSize
+  };
+};